@@ -9,12 +9,24 @@ imports short while still reusing the implementations that live in
 
 from .datastore import (
     get_db_connection,
+    close_db,
+    transaction,
+    read_conn,
+    with_write,
     create_tables,
     save_market_to_db,
+    save_markets_to_db,
     save_orderbook_to_db,
+    save_orderbooks_to_db,
+    build_orderbook_row,
+    load_orderbook_data,
+    pack_book_side,
+    unpack_book_side,
     fetch_and_save_markets,
     list_markets,
+    list_markets_page,
     get_market,
+    get_market_token_ids,
     get_markets,
     delete_market,
     clear_database,
@@ -25,12 +37,24 @@ from .datastore import (
 # Explicit export list to make the module intent clear and help static analyzers.
 __all__ = [
     "get_db_connection",
+    "close_db",
+    "transaction",
+    "read_conn",
+    "with_write",
     "create_tables",
     "save_market_to_db",
+    "save_markets_to_db",
     "save_orderbook_to_db",
+    "save_orderbooks_to_db",
+    "build_orderbook_row",
+    "load_orderbook_data",
+    "pack_book_side",
+    "unpack_book_side",
     "fetch_and_save_markets",
     "list_markets",
+    "list_markets_page",
     "get_market",
+    "get_market_token_ids",
     "get_markets",
     "delete_market",
     "clear_database",
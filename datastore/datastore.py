@@ -15,11 +15,24 @@ CLI Commands:
 - python datastore.py clear                  Clear all data
 """
 
+import atexit
+import os
+import queue
 import sqlite3
+import sys
 import argparse
 import json
+import threading
+import zlib
+import orjson
+import requests
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from pathlib import Path
+from itertools import chain
+from operator import itemgetter
+from requests.adapters import HTTPAdapter
 # Support both package-style imports (when scripts use `from datastore import ...`)
 # and direct execution (e.g. `python datastore/datastore.py`).
 try:
@@ -38,6 +51,19 @@ except ImportError:  # pragma: no cover - fallback for direct execution context
     )
 
 
+CLOB_BOOK_URL = "https://clob.polymarket.com/book"
+
+# Max concurrent CLOB requests when fetching the books of a market's tokens
+ORDERBOOK_FETCH_WORKERS = 8
+
+# Shared HTTP session so repeated CLOB calls reuse pooled keep-alive
+# connections instead of paying a TCP+TLS handshake per request
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+
 # Alias functions from marketdata for backward compatibility
 def get_markets(active=True, limit=100, offset=0, closed=False, ascending=False, tag_id=None):
     """Alias for get_markets_gamma from marketdata.py"""
@@ -74,14 +100,330 @@ def load_markets_from_file(filename="markets.json"):
 
 DB_PATH = "data/markets.db"
 
-def get_db_connection():
-    """Get a connection to the SQLite database."""
-    Path("data").mkdir(exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+# Create the database directory once at import rather than on every connect
+if not os.path.isdir(os.path.dirname(DB_PATH)):
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+
+# Durability/speed trade-off for commits (OFF, NORMAL, FULL, EXTRA).
+# NORMAL is safe in WAL mode: a power loss may roll back the last commit but
+# never corrupts the database.
+SQLITE_SYNCHRONOUS = os.environ.get("POLYMARKET_SQLITE_SYNCHRONOUS", "NORMAL").upper()
+if SQLITE_SYNCHRONOUS not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+    SQLITE_SYNCHRONOUS = "NORMAL"
+
+# How long a connection waits on a lock held by another connection (e.g. the
+# events and orderbook threads writing at once) before raising
+# "database is locked", in milliseconds
+SQLITE_BUSY_TIMEOUT_MS = 5000
+
+# Page size for newly created database files. Order book rows carry
+# multi-KB payloads, which spill into overflow pages at the 4 KB default;
+# larger pages keep more of each row on its leaf page. SQLite only applies
+# this before the first table is created (an existing WAL database keeps its
+# page size), so older files are left as they are.
+SQLITE_PAGE_SIZE = 16384
+
+# journal_mode=WAL is persistent in the database file, so it only needs to be
+# set once per process
+_wal_enabled = False
+
+# Databases created by an older version are brought up to the current schema
+# (see _upgrade_schema) the first time a writable connection is opened
+_schema_checked = False
+
+# One cached connection per thread (sqlite3 connections are not shareable
+# across threads by default)
+_local = threading.local()
+
+# Writes all go through one shared connection, serialized by _WRITE_LOCK, so
+# concurrent writers queue in-process instead of racing for the file lock.
+# Reads can use a pool of read-only connections, which run alongside the
+# writer under WAL. Both are opened on first use.
+_WRITE_CONN = None
+_WRITE_LOCK = threading.RLock()
+_READ_POOL = queue.SimpleQueue()
+
+# Rows per executemany call when writing in bulk
+BATCH_SIZE = 10000
+
+MARKET_INSERT_SQL = """
+    INSERT OR REPLACE INTO markets (
+        id, question, slug, conditionId, description, outcomes,
+        active, closed, archived, restricted, featured,
+        startDate, endDate, createdAt, updatedAt,
+        volume, liquidity, volume24hr, volume1wk, volume1mo, volume1yr,
+        enableOrderBook, orderPriceMinTickSize, orderMinSize, clobTokenIds, market_data,
+        updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+"""
+
+# market_tokens mirrors each market's clobTokenIds JSON as one row per token
+# (ord = position in the list), so token lookups need no JSON parsing. A
+# market's rows are replaced whenever the market is saved.
+MARKET_TOKENS_DELETE_SQL = "DELETE FROM market_tokens WHERE market_id = ?"
+MARKET_TOKENS_INSERT_SQL = """
+    INSERT OR REPLACE INTO market_tokens (market_id, token_id, ord) VALUES (?, ?, ?)
+"""
+
+# The raw orderbook_data payload is stored as a zlib-compressed JSON BLOB;
+# level 1 is cheap on CPU and still shrinks the levels several-fold. Use
+# load_orderbook_data() to read it back (older rows hold plain JSON text).
+ORDERBOOK_COMPRESS_LEVEL = 1
+
+# bids_blob/asks_blob hold each side as packed native float64 (price, size)
+# pairs, so readers can decode them with array('d') or numpy.frombuffer
+# instead of re-parsing JSON; use unpack_book_side() to read them back.
+# float64 keeps sizes exact (float32 would round anything past ~7 digits).
+# New rows leave the older JSON bids/asks columns NULL (the full payload is
+# still in orderbook_data).
+BOOK_SIDE_TYPECODE = 'd'
+
+# Re-saving the same snapshot (same market, token and API timestamp) is a no-op.
+# SQLite treats NULLs as distinct in a UNIQUE index, so books without an API
+# timestamp (including every row written before timestamps were stored) are
+# never deduplicated: each save of such a book is kept as its own snapshot.
+ORDERBOOK_INSERT_SQL = """
+    INSERT INTO orderbooks (
+        market_id, token_id, timestamp, bids_blob, asks_blob,
+        min_order_size, tick_size, neg_risk, orderbook_data
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (market_id, token_id, timestamp) DO NOTHING
+"""
+
+
+def _connect(read_only=False):
+    """
+    Open and configure a new connection to the SQLite database.
+    
+    Args:
+        read_only (bool): Open the database with mode=ro (it must exist)
+    """
+    global _wal_enabled, _schema_checked
+    
+    # Autocommit mode: writers open explicit transactions with transaction().
+    # The larger statement cache keeps every hot INSERT/SELECT prepared for
+    # the lifetime of the (long-lived) connection. Shared connections are
+    # handed between threads, always one thread at a time.
+    if read_only:
+        conn = sqlite3.connect(
+            f"file:{os.path.abspath(DB_PATH)}?mode=ro", uri=True,
+            isolation_level=None, cached_statements=256, check_same_thread=False
+        )
+    else:
+        conn = sqlite3.connect(
+            DB_PATH, isolation_level=None, cached_statements=256, check_same_thread=False
+        )
     conn.row_factory = sqlite3.Row
+    
+    # Per-connection settings
+    conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")  # 64 MB page cache
+    conn.execute("PRAGMA mmap_size=268435456")  # 256 MB memory map
+    
+    # One-time database setup. Thread-local connections can be opened by
+    # several threads at once, so the checks run under the write lock (which
+    # also keeps the schema upgrade from racing the shared writer).
+    if not read_only:
+        with _WRITE_LOCK:
+            if not _wal_enabled:
+                conn.execute(f"PRAGMA page_size={SQLITE_PAGE_SIZE}")
+                conn.execute("PRAGMA journal_mode=WAL")
+                _wal_enabled = True
+            if not _schema_checked:
+                _upgrade_schema(conn)
+                _schema_checked = True
+    return conn
+
+
+def _upgrade_schema(conn):
+    """
+    Bring tables created by an older version up to the current schema.
+    
+    Every step is idempotent and skips tables that do not exist yet (those are
+    created by create_tables), so this is safe on any database. Call it with
+    _WRITE_LOCK held.
+    
+    Args:
+        conn: Writable connection in autocommit mode
+    """
+    # Token ids per market, in clobTokenIds order; the primary key serves
+    # lookups by market_id in order. Market saves write it, so it must exist
+    # before the first save.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS market_tokens (
+            market_id TEXT NOT NULL,
+            token_id TEXT NOT NULL,
+            ord INTEGER NOT NULL,
+            PRIMARY KEY (market_id, ord)
+        ) WITHOUT ROWID
+    """)
+    
+    orderbook_columns = {row[1] for row in conn.execute("PRAGMA table_info(orderbooks)")}
+    if not orderbook_columns:
+        return
+    
+    # ORDERBOOK_INSERT_SQL writes the packed bid/ask columns
+    for column in ("bids_blob", "asks_blob"):
+        if column not in orderbook_columns:
+            try:
+                conn.execute(f"ALTER TABLE orderbooks ADD COLUMN {column} BLOB")
+            except sqlite3.OperationalError:
+                # ADD COLUMN has no IF NOT EXISTS; another process may have
+                # added it since the check above
+                if column not in {row[1] for row in conn.execute("PRAGMA table_info(orderbooks)")}:
+                    raise
+    
+    # showorderbook's latest-row query (MAX(id) per token of a market) is
+    # served by idx_orderbooks_snapshot, whose (market_id, token_id) prefix
+    # plus the implicit rowid cover it; the index keyed on the old
+    # COALESCE(timestamp, created_at) ordering is no longer used
+    conn.execute("DROP INDEX IF EXISTS idx_ob_market_token_time")
+    
+    has_snapshot_index = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_orderbooks_snapshot'"
+    ).fetchone()
+    if not has_snapshot_index:
+        # ORDERBOOK_INSERT_SQL's ON CONFLICT needs this unique index. Older
+        # databases may hold repeated snapshots, which would make the index
+        # fail to build, so all but the first copy of each are dropped first
+        # (rows with a NULL timestamp never collide and are kept).
+        with transaction(conn):
+            conn.execute("""
+                DELETE FROM orderbooks
+                WHERE timestamp IS NOT NULL AND id NOT IN (
+                    SELECT MIN(id) FROM orderbooks
+                    WHERE timestamp IS NOT NULL
+                    GROUP BY market_id, token_id, timestamp
+                )
+            """)
+            # One row per (market, token, API timestamp) snapshot; its
+            # market_id prefix also serves lookups by market, replacing
+            # idx_orderbooks_market
+            conn.execute("DROP INDEX IF EXISTS idx_orderbooks_market")
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_orderbooks_snapshot "
+                "ON orderbooks(market_id, token_id, timestamp)"
+            )
+
+
+def get_db_connection():
+    """
+    Get the connection to the SQLite database for the current thread.
+    
+    The connection is opened lazily and reused by every helper on the same
+    thread, so callers must not close it. Use close_db() on shutdown.
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = _connect()
+        _local.conn = conn
     return conn
 
 
+@contextmanager
+def read_conn():
+    """
+    Borrow a read-only connection from the pool for the duration of a block.
+    
+    The pool grows to the number of concurrent readers and connections are
+    returned to it afterwards, so callers must not close them. A missing
+    database file is created first (mode=ro cannot create it), as a
+    writable connection would.
+    
+    Yields:
+        sqlite3.Connection: A read-only connection
+    """
+    try:
+        conn = _READ_POOL.get_nowait()
+    except queue.Empty:
+        if not os.path.exists(DB_PATH):
+            with_write(lambda conn: None)
+        conn = _connect(read_only=True)
+    try:
+        yield conn
+    finally:
+        _READ_POOL.put(conn)
+
+
+def _writer():
+    """Return the shared writer connection; call with _WRITE_LOCK held."""
+    global _WRITE_CONN
+    if _WRITE_CONN is None:
+        _WRITE_CONN = _connect()
+    return _WRITE_CONN
+
+
+def with_write(fn):
+    """
+    Run fn(conn) on the shared writer connection, holding the write lock.
+    
+    Args:
+        fn: Callable taking the writer connection
+    
+    Returns:
+        Whatever fn returns
+    """
+    with _WRITE_LOCK:
+        return fn(_writer())
+
+
+@contextmanager
+def transaction(conn=None):
+    """
+    Run a block of statements inside one explicit BEGIN/COMMIT.
+    
+    Connections are opened in autocommit mode, so anything that writes more
+    than one row should go through this to get a single commit (and fsync).
+    Rolls back and re-raises on error.
+    
+    Args:
+        conn: Connection to use (default: the shared writer connection, held
+              under the write lock for the whole block)
+    
+    Yields:
+        sqlite3.Connection: The connection the transaction runs on
+    """
+    if conn is None:
+        with _WRITE_LOCK:
+            with transaction(_writer()) as conn:
+                yield conn
+        return
+    
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def close_db():
+    """Close the current thread's cached database connection, if any."""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
+@atexit.register
+def _close_shared_connections():
+    """Close the shared writer and pooled read connections at exit."""
+    global _WRITE_CONN
+    with _WRITE_LOCK:
+        if _WRITE_CONN is not None:
+            _WRITE_CONN.close()
+            _WRITE_CONN = None
+    while True:
+        try:
+            _READ_POOL.get_nowait().close()
+        except queue.Empty:
+            break
+    close_db()
+
+
 def create_tables():
     """Create database tables for markets, events, and order books."""
     conn = get_db_connection()
@@ -151,6 +493,8 @@ def create_tables():
             timestamp TEXT,
             bids TEXT,
             asks TEXT,
+            bids_blob BLOB,
+            asks_blob BLOB,
             min_order_size TEXT,
             tick_size TEXT,
             neg_risk BOOLEAN,
@@ -161,177 +505,422 @@ def create_tables():
     """)
     
     # Create indexes for faster queries
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_markets_active ON markets(active)")
+    # (active, closed, updated_at, id) serves list_markets' filter + ORDER BY +
+    # LIMIT and its keyset cursor directly (id breaks updated_at ties, since a
+    # batch shares one timestamp); it also covers lookups on `active` alone,
+    # so the old single-column index is redundant
+    cursor.execute("DROP INDEX IF EXISTS idx_markets_active")
+    cursor.execute("DROP INDEX IF EXISTS idx_markets_active_closed_updated")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_markets_active_closed_updated_id "
+        "ON markets(active, closed, updated_at DESC, id DESC)"
+    )
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_markets_closed ON markets(closed)")
+    # Covers the per-status counts (one scan of this small index instead of
+    # the table and its market_data JSON); lookups by id use the primary key
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_markets_status ON markets(active, closed, archived)"
+    )
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_markets_slug ON markets(slug)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_orderbooks_market ON orderbooks(market_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_orderbooks_token ON orderbooks(token_id)")
+    # Adds market_tokens, the packed bid/ask columns and the order book indexes
+    # (to tables that already existed)
+    with _WRITE_LOCK:
+        _upgrade_schema(conn)
     
-    conn.commit()
-    conn.close()
     print("Database tables created successfully!")
 
 
+def _to_json(value):
+    """Serialize a value to JSON text for a TEXT column (orjson is 2-5x faster than json)."""
+    return orjson.dumps(value).decode()
+
+
+def build_market_row(market):
+    """
+    Build the INSERT parameter tuple for a single market.
+    
+    Args:
+        market: Market dictionary from the Gamma API
+    
+    Returns:
+        tuple: Parameters matching MARKET_INSERT_SQL
+    """
+    return (
+        market.get('id'),
+        market.get('question'),
+        market.get('slug'),
+        market.get('conditionId'),
+        market.get('description'),
+        market.get('outcomes'),
+        market.get('active'),
+        market.get('closed'),
+        market.get('archived'),
+        market.get('restricted'),
+        market.get('featured'),
+        market.get('startDate'),
+        market.get('endDate'),
+        market.get('createdAt'),
+        market.get('updatedAt'),
+        market.get('volume'),
+        market.get('liquidity'),
+        market.get('volume24hr'),
+        market.get('volume1wk'),
+        market.get('volume1mo'),
+        market.get('volume1yr'),
+        market.get('enableOrderBook'),
+        market.get('orderPriceMinTickSize'),
+        market.get('orderMinSize'),
+        market.get('clobTokenIds'),
+        _to_json(market)
+    )
+
+
+def build_market_token_rows(market):
+    """
+    Build the market_tokens rows for a single market.
+    
+    Args:
+        market: Market dictionary from the Gamma API
+    
+    Returns:
+        list: (market_id, token_id, ord) tuples; empty when the market has no
+              parseable clobTokenIds
+    """
+    token_ids = market.get('clobTokenIds')
+    if isinstance(token_ids, str):
+        try:
+            token_ids = orjson.loads(token_ids)
+        except orjson.JSONDecodeError:
+            return []
+    if not isinstance(token_ids, list):
+        return []
+    market_id = market.get('id')
+    return [
+        (market_id, str(token_id), position)
+        for position, token_id in enumerate(token_ids)
+        if token_id
+    ]
+
+
+def _write_markets(conn, markets):
+    """Insert markets and replace their market_tokens rows on conn."""
+    conn.executemany(MARKET_INSERT_SQL, [build_market_row(market) for market in markets])
+    conn.executemany(MARKET_TOKENS_DELETE_SQL, [(market.get('id'),) for market in markets])
+    conn.executemany(
+        MARKET_TOKENS_INSERT_SQL,
+        [row for market in markets for row in build_market_token_rows(market)]
+    )
+
+
 def save_market_to_db(market):
     """Save a single market to the database."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute("""
-            INSERT OR REPLACE INTO markets (
-                id, question, slug, conditionId, description, outcomes,
-                active, closed, archived, restricted, featured,
-                startDate, endDate, createdAt, updatedAt,
-                volume, liquidity, volume24hr, volume1wk, volume1mo, volume1yr,
-                enableOrderBook, orderPriceMinTickSize, orderMinSize, clobTokenIds, market_data,
-                updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-        """, (
-            market.get('id'),
-            market.get('question'),
-            market.get('slug'),
-            market.get('conditionId'),
-            market.get('description'),
-            market.get('outcomes'),
-            market.get('active'),
-            market.get('closed'),
-            market.get('archived'),
-            market.get('restricted'),
-            market.get('featured'),
-            market.get('startDate'),
-            market.get('endDate'),
-            market.get('createdAt'),
-            market.get('updatedAt'),
-            market.get('volume'),
-            market.get('liquidity'),
-            market.get('volume24hr'),
-            market.get('volume1wk'),
-            market.get('volume1mo'),
-            market.get('volume1yr'),
-            market.get('enableOrderBook'),
-            market.get('orderPriceMinTickSize'),
-            market.get('orderMinSize'),
-            market.get('clobTokenIds'),
-            json.dumps(market)
-        ))
-        conn.commit()
+        with transaction() as conn:
+            _write_markets(conn, [market])
         return True
     except Exception as e:
         print(f"Error saving market {market.get('id')}: {e}")
         return False
-    finally:
-        conn.close()
+
+
+def save_markets_to_db(markets):
+    """
+    Save many markets to the database in a single transaction.
+    
+    If the batch fails (e.g. one malformed market), markets are retried one by
+    one so a single bad row does not discard the whole batch.
+    
+    Args:
+        markets: List of market dictionaries from the Gamma API
+    
+    Returns:
+        int: Number of markets saved
+    """
+    try:
+        with transaction() as conn:
+            for start in range(0, len(markets), BATCH_SIZE):
+                _write_markets(conn, markets[start:start + BATCH_SIZE])
+        return len(markets)
+    except Exception as e:
+        print(f"Batch save failed ({e}), saving markets individually...")
+        return sum(1 for market in markets if save_market_to_db(market))
+
+
+def pack_book_side(levels):
+    """
+    Pack one side of an order book into a BLOB of float64 (price, size) pairs.
+    
+    Args:
+        levels: List of {"price", "size"} dicts (CLOB API) or [price, size] pairs
+    
+    Returns:
+        bytes: Packed pairs in the API's level order
+    """
+    if not levels:
+        return b''
+    # Flatten to price, size, price, size, ... and let array() consume the
+    # iterator, so the per-level work stays in C
+    pick = itemgetter('price', 'size') if isinstance(levels[0], dict) else itemgetter(0, 1)
+    return array(BOOK_SIDE_TYPECODE, map(float, chain.from_iterable(map(pick, levels)))).tobytes()
+
+
+def unpack_book_side(blob):
+    """
+    Decode a bids_blob/asks_blob value back into [price, size] pairs.
+    
+    Args:
+        blob: Bytes written by pack_book_side
+    
+    Returns:
+        list: [[price, size], ...] as floats (empty for a NULL column)
+    """
+    if not blob:
+        return []
+    values = array(BOOK_SIDE_TYPECODE)
+    values.frombytes(blob)
+    return [[values[i], values[i + 1]] for i in range(0, len(values), 2)]
+
+
+def build_orderbook_row(market_id, token_id, orderbook_data):
+    """
+    Build the INSERT parameter tuple for a single order book.
+    
+    Args:
+        market_id: Market ID
+        token_id: Token ID
+        orderbook_data: Orderbook data from API
+    
+    Returns:
+        tuple: Parameters matching ORDERBOOK_INSERT_SQL
+    """
+    return (
+        market_id,
+        token_id,
+        orderbook_data.get('timestamp'),
+        pack_book_side(orderbook_data.get('bids')),
+        pack_book_side(orderbook_data.get('asks')),
+        orderbook_data.get('min_order_size'),
+        orderbook_data.get('tick_size'),
+        orderbook_data.get('neg_risk'),
+        zlib.compress(orjson.dumps(orderbook_data), ORDERBOOK_COMPRESS_LEVEL)
+    )
+
+
+def load_orderbook_data(value):
+    """
+    Decode an orderbooks.orderbook_data value.
+    
+    Args:
+        value: Compressed BLOB (current rows) or JSON text (older rows)
+    
+    Returns:
+        dict: The order book as returned by the CLOB API, or None
+    """
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        value = zlib.decompress(value)
+    return orjson.loads(value)
+
+
+def save_orderbooks_to_db(rows):
+    """
+    Save many order book rows in a single transaction.
+    
+    Args:
+        rows: List of tuples built with build_orderbook_row
+    
+    Returns:
+        int: Number of rows saved, counting snapshots that were already stored
+             (0 on error)
+    """
+    try:
+        with transaction() as conn:
+            for start in range(0, len(rows), BATCH_SIZE):
+                conn.executemany(ORDERBOOK_INSERT_SQL, rows[start:start + BATCH_SIZE])
+        return len(rows)
+    except Exception as e:
+        print(f"Error saving orderbooks: {e}")
+        return 0
 
 
 def save_orderbook_to_db(market_id, token_id, orderbook_data):
     """Save order book data to the database."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute("""
-            INSERT INTO orderbooks (
-                market_id, token_id, timestamp, bids, asks,
-                min_order_size, tick_size, neg_risk, orderbook_data
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            market_id,
-            token_id,
-            orderbook_data.get('timestamp'),
-            json.dumps(orderbook_data.get('bids', [])),
-            json.dumps(orderbook_data.get('asks', [])),
-            orderbook_data.get('min_order_size'),
-            orderbook_data.get('tick_size'),
-            orderbook_data.get('neg_risk'),
-            json.dumps(orderbook_data)
-        ))
-        conn.commit()
+        row = build_orderbook_row(market_id, token_id, orderbook_data)
+        with_write(lambda conn: conn.execute(ORDERBOOK_INSERT_SQL, row))
         return True
     except Exception as e:
         print(f"Error saving orderbook: {e}")
         return False
-    finally:
-        conn.close()
 
 
-def fetch_and_save_markets(limit=100, use_events=False):
-    """Fetch markets from API and save to database."""
-    print(f"Fetching {limit} markets from API...")
+def iter_market_batches(limit=100, use_events=False):
+    """
+    Yield batches of markets from the API until `limit` markets have been seen.
+    
+    Args:
+        limit (int): Total number of markets to fetch
+        use_events (bool): Use the /events endpoint instead of /markets
     
-    all_markets = []
+    Yields:
+        list: Markets returned by one API page
+    """
     batch_size = 100
     offset = 0
+    fetched = 0
     
-    while len(all_markets) < limit:
-        remaining = limit - len(all_markets)
+    while fetched < limit:
+        remaining = limit - fetched
         current_batch = min(batch_size, remaining)
         
         if use_events:
             events = get_events(limit=current_batch, offset=offset, closed=False)
             if not events:
                 break
+            markets = []
             for event in events:
                 if 'markets' in event and event['markets']:
-                    all_markets.extend(event['markets'])
+                    markets.extend(event['markets'])
         else:
             markets = get_markets(active=True, limit=current_batch, offset=offset, closed=False)
             if not markets:
                 break
-            all_markets.extend(markets)
         
+        fetched += len(markets)
         offset += current_batch
-        if len(all_markets) >= limit:
-            break
+        yield markets
+
+
+def fetch_and_save_markets(limit=100, use_events=False):
+    """
+    Fetch markets from API and save to database.
     
-    # Save to database
-    print(f"Saving {len(all_markets)} markets to database...")
+    Each API page is written as soon as it arrives, so memory stays bounded
+    to one page regardless of `limit`.
+    """
+    print(f"Fetching {limit} markets from API...")
+    
+    fetched = 0
     saved = 0
-    for market in all_markets:
-        if save_market_to_db(market):
-            saved += 1
+    for markets in iter_market_batches(limit=limit, use_events=use_events):
+        if not markets:
+            continue
+        fetched += len(markets)
+        saved += save_markets_to_db(markets)
+        print(f"Saved {saved}/{fetched} markets to database...")
     
     print(f"Successfully saved {saved} markets to database!")
     return saved
 
 
-def list_markets(active_only=True, limit=50):
-    """List markets from database."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+def list_markets(active_only=True, limit=50, before=None):
+    """
+    List markets from database, most recently updated first.
+    
+    Args:
+        active_only (bool): Only list active, unclosed markets
+        limit (int): Maximum number of markets to return
+        before (str): Cursor printed by a previous page, or None for the first
+                      page (see list_markets_page)
+    
+    Returns:
+        list: Market rows
+    """
+    markets, _ = list_markets_page(active_only=active_only, limit=limit, before=before)
+    return markets
+
+
+def list_markets_page(active_only=True, limit=50, before=None):
+    """
+    List one page of markets from database, most recently updated first.
+    
+    Pages are keyset-paginated on (updated_at, id): pass the cursor returned
+    by the previous call as ``before`` to get the next page without an
+    OFFSET scan.
     
-    query = "SELECT id, question, slug, active, closed, volume, liquidity FROM markets"
+    Args:
+        active_only (bool): Only list active, unclosed markets
+        limit (int): Maximum number of markets to return
+        before (str): Cursor from a previous call ("updated_at|id"), or None
+                      for the first page
+    
+    Returns:
+        tuple: (markets, next_cursor) where next_cursor is None on the last page
+    """
+    query = "SELECT id, question, slug, active, closed, volume, liquidity, updated_at FROM markets"
+    conditions = []
     params = []
     
     if active_only:
-        query += " WHERE active = 1 AND closed = 0"
-    
-    query += " ORDER BY updated_at DESC LIMIT ?"
-    params.append(limit)
+        conditions.append("active = 1 AND closed = 0")
     
-    cursor.execute(query, params)
-    markets = cursor.fetchall()
-    conn.close()
+    if before:
+        before_updated_at, _, before_id = before.partition("|")
+        conditions.append("(updated_at, id) < (?, ?)")
+        params.extend([before_updated_at, before_id])
     
-    print(f"\n{'ID':<10} {'Active':<8} {'Closed':<8} {'Volume':<12} {'Liquidity':<12} {'Question'}")
-    print("=" * 100)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
     
-    for market in markets:
-        print(f"{market['id']:<10} {str(market['active']):<8} {str(market['closed']):<8} "
-              f"{market['volume'] or 0:<12.2f} {market['liquidity'] or 0:<12.2f} {market['question'][:50]}")
+    query += " ORDER BY updated_at DESC, id DESC LIMIT ?"
+    params.append(limit)
     
-    print(f"\nTotal: {len(markets)} markets")
-    return markets
+    with read_conn() as conn:
+        markets = conn.execute(query, params).fetchall()
+    
+    next_cursor = None
+    if len(markets) == limit and markets:
+        last = markets[-1]
+        next_cursor = f"{last['updated_at']}|{last['id']}"
+    
+    # Build the whole table and write it once instead of one print() per row
+    lines = [
+        f"\n{'ID':<10} {'Active':<8} {'Closed':<8} {'Volume':<12} {'Liquidity':<12} {'Question'}",
+        "=" * 100,
+    ]
+    lines.extend(
+        f"{market['id']:<10} {str(market['active']):<8} {str(market['closed']):<8} "
+        f"{market['volume'] or 0:<12.2f} {market['liquidity'] or 0:<12.2f} {market['question'][:50]}"
+        for market in markets
+    )
+    lines.append(f"\nTotal: {len(markets)} markets")
+    if next_cursor:
+        lines.append(f"Next page: --before '{next_cursor}'")
+    sys.stdout.write("\n".join(lines) + "\n")
+    return markets, next_cursor
 
 
-def get_market(market_id):
-    """Get a specific market by ID."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+# Every markets column except the raw market_data JSON, which is by far the
+# largest and is only needed on request
+MARKET_SUMMARY_COLUMNS = """
+    id, question, slug, conditionId, description, outcomes,
+    active, closed, archived, restricted, featured,
+    startDate, endDate, createdAt, updatedAt,
+    volume, liquidity, volume24hr, volume1wk, volume1mo, volume1yr,
+    enableOrderBook, orderPriceMinTickSize, orderMinSize, clobTokenIds,
+    created_at, updated_at
+"""
+
+
+def get_market(market_id, include_raw=False):
+    """
+    Get a specific market by ID.
     
-    cursor.execute("SELECT * FROM markets WHERE id = ?", (market_id,))
-    market = cursor.fetchone()
-    conn.close()
+    Args:
+        market_id (str): Market ID to look up
+        include_raw (bool): Also load the raw market_data JSON column
+    
+    Returns:
+        dict: Market columns, or None if the market is not stored
+    """
+    columns = MARKET_SUMMARY_COLUMNS
+    if include_raw:
+        columns += ", market_data"
+    
+    with read_conn() as conn:
+        market = conn.execute(f"SELECT {columns} FROM markets WHERE id = ?", (market_id,)).fetchone()
     
     if market:
         print(f"\nMarket: {market['question']}")
@@ -348,15 +937,48 @@ def get_market(market_id):
         return None
 
 
+def get_market_token_ids(market_id):
+    """
+    Get a market's token ids from the market_tokens table.
+    
+    Markets saved before market_tokens existed (or a database that has not
+    been opened for writing since) fall back to the stored clobTokenIds JSON.
+    
+    Args:
+        market_id (str): Market ID to look up
+    
+    Returns:
+        list: Token ids in clobTokenIds order (empty if none are stored)
+    """
+    with read_conn() as conn:
+        try:
+            rows = conn.execute(
+                "SELECT token_id FROM market_tokens WHERE market_id = ? ORDER BY ord",
+                (market_id,)
+            ).fetchall()
+        except sqlite3.OperationalError:
+            rows = []
+        if rows:
+            return [row[0] for row in rows]
+        
+        try:
+            row = conn.execute(
+                "SELECT clobTokenIds FROM markets WHERE id = ?", (market_id,)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return []
+    
+    if row is None:
+        return []
+    token_rows = build_market_token_rows({'id': market_id, 'clobTokenIds': row[0]})
+    return [token_id for _, token_id, _ in token_rows]
+
+
 def delete_market(market_id):
     """Delete a market from the database."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("DELETE FROM markets WHERE id = ?", (market_id,))
-    deleted = cursor.rowcount
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        deleted = conn.execute("DELETE FROM markets WHERE id = ?", (market_id,)).rowcount
+        conn.execute(MARKET_TOKENS_DELETE_SQL, (market_id,))
     
     if deleted:
         print(f"Market {market_id} deleted successfully")
@@ -368,59 +990,34 @@ def delete_market(market_id):
 
 def clear_database():
     """Clear all data from the database."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("DELETE FROM orderbooks")
-    cursor.execute("DELETE FROM markets")
-    cursor.execute("DELETE FROM events")
+    with transaction() as conn:
+        conn.execute("DELETE FROM orderbooks")
+        conn.execute("DELETE FROM markets")
+        conn.execute("DELETE FROM market_tokens")
+        conn.execute("DELETE FROM events")
     
-    conn.commit()
-    conn.close()
     print("Database cleared successfully!")
 
 
-def save_orderbook_to_db(market_id, token_id, orderbook_data):
+def _fetch_book(token_id):
     """
-    Save orderbook data to database.
+    Fetch one token's order book from the CLOB API.
     
     Args:
-        market_id: Market ID
-        token_id: Token ID
-        orderbook_data: Orderbook data from API
+        token_id (str): Token ID to fetch the book for
     
     Returns:
-        bool: True if successful
+        tuple: (orderbook_data, None) on success, (None, error message) otherwise
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        # Parse orderbook data
-        bids = orderbook_data.get('bids', [])
-        asks = orderbook_data.get('asks', [])
-        
-        # Insert or update orderbook
-        cursor.execute("""
-            INSERT OR REPLACE INTO orderbooks (
-                market_id, token_id, bids, asks, orderbook_data, created_at
-            ) VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-        """, (
-            market_id,
-            token_id,
-            json.dumps(bids),
-            json.dumps(asks),
-            json.dumps(orderbook_data)
-        ))
-        
-        conn.commit()
-        conn.close()
-        return True
+        response = SESSION.get(CLOB_BOOK_URL, params={"token_id": token_id}, timeout=30)
         
+        if response.status_code == 200:
+            return orjson.loads(response.content), None
+        return None, f"No orderbook available (status: {response.status_code})"
+    
     except Exception as e:
-        conn.close()
-        print(f"Error saving orderbook: {e}")
-        return False
+        return None, f"Error: {e}"
 
 
 def fetch_orderbook_for_market(market_id):
@@ -433,16 +1030,13 @@ def fetch_orderbook_for_market(market_id):
     Returns:
         bool: True if successful, False otherwise
     """
-    import requests
-    
     print(f"Fetching orderbook for market {market_id}...")
     
     # Get market details from database
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM markets WHERE id = ?", (market_id,))
+    cursor.execute("SELECT question, clobTokenIds FROM markets WHERE id = ?", (market_id,))
     market = cursor.fetchone()
-    conn.close()
     
     if not market:
         print(f"Error: Market {market_id} not found in database")
@@ -459,38 +1053,27 @@ def fetch_orderbook_for_market(market_id):
     
     print(f"Found {len(token_ids)} token(s)")
     
-    # Fetch orderbook for each token
-    success_count = 0
-    for i, token_id in enumerate(token_ids, 1):
+    # Fetch all token books concurrently; map() keeps results in token order
+    with ThreadPoolExecutor(max_workers=ORDERBOOK_FETCH_WORKERS) as executor:
+        results = list(executor.map(_fetch_book, token_ids))
+    
+    rows = []
+    for i, (token_id, (orderbook_data, error)) in enumerate(zip(token_ids, results), 1):
         print(f"\nToken {i}/{len(token_ids)}: {token_id[:20]}...")
         
-        # Fetch orderbook from CLOB API
-        url = "https://clob.polymarket.com/book"
-        params = {"token_id": token_id}
+        if orderbook_data is None:
+            print(f"  {error}")
+            continue
         
-        try:
-            response = requests.get(url, params=params)
-            
-            if response.status_code == 200:
-                orderbook_data = response.json()
-                
-                # Count bids and asks
-                bids_count = len(orderbook_data.get('bids', []))
-                asks_count = len(orderbook_data.get('asks', []))
-                
-                print(f"  Success! Bids: {bids_count}, Asks: {asks_count}")
-                
-                # Save to database
-                if save_orderbook_to_db(market_id, token_id, orderbook_data):
-                    print(f"  Saved to database")
-                    success_count += 1
-                else:
-                    print(f"  Failed to save to database")
-            else:
-                print(f"  No orderbook available (status: {response.status_code})")
+        # Count bids and asks
+        bids_count = len(orderbook_data.get('bids', []))
+        asks_count = len(orderbook_data.get('asks', []))
         
-        except Exception as e:
-            print(f"  Error: {e}")
+        print(f"  Success! Bids: {bids_count}, Asks: {asks_count}")
+        rows.append(build_orderbook_row(market_id, token_id, orderbook_data))
+    
+    # Save all fetched orderbooks in one transaction
+    success_count = save_orderbooks_to_db(rows) if rows else 0
     
     print(f"\n{'='*60}")
     print(f"Summary: {success_count}/{len(token_ids)} orderbooks saved")
@@ -501,30 +1084,24 @@ def fetch_orderbook_for_market(market_id):
 
 def get_stats():
     """Get database statistics."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Total markets
-    cursor.execute("SELECT COUNT(*) as total FROM markets")
-    total = cursor.fetchone()['total']
-    
-    # Active markets
-    cursor.execute("SELECT COUNT(*) as active FROM markets WHERE active = 1 AND closed = 0")
-    active = cursor.fetchone()['active']
-    
-    # Closed markets
-    cursor.execute("SELECT COUNT(*) as closed FROM markets WHERE closed = 1")
-    closed = cursor.fetchone()['closed']
-    
-    # Total order books
-    cursor.execute("SELECT COUNT(*) as orderbooks FROM orderbooks")
-    orderbooks = cursor.fetchone()['orderbooks']
-    
-    # Total volume
-    cursor.execute("SELECT SUM(volume) as total_volume FROM markets")
-    total_volume = cursor.fetchone()['total_volume'] or 0
+    with read_conn() as conn:
+        # All market statistics in a single pass over the table
+        row = conn.execute("""
+            SELECT
+                COUNT(*) AS total,
+                COALESCE(SUM(active = 1 AND closed = 0), 0) AS active,
+                COALESCE(SUM(closed = 1), 0) AS closed,
+                COALESCE(SUM(volume), 0) AS total_volume
+            FROM markets
+        """).fetchone()
+        
+        # Total order books
+        orderbooks = conn.execute("SELECT COUNT(*) as orderbooks FROM orderbooks").fetchone()['orderbooks']
     
-    conn.close()
+    total = row['total']
+    active = row['active']
+    closed = row['closed']
+    total_volume = row['total_volume']
     
     print("\n=== Database Statistics ===")
     print(f"Total Markets: {total}")
@@ -557,6 +1134,7 @@ def main():
     list_parser.add_argument('--active', action='store_true', default=True, help='Show only active markets')
     list_parser.add_argument('--all', action='store_true', help='Show all markets')
     list_parser.add_argument('--limit', type=int, default=50, help='Number of markets to show')
+    list_parser.add_argument('--before', help='Cursor printed by the previous page')
     
     # Get command
     get_parser = subparsers.add_parser('get', help='Get specific market')
@@ -592,7 +1170,7 @@ def main():
     
     elif args.command == 'list':
         active_only = not args.all
-        list_markets(active_only=active_only, limit=args.limit)
+        list_markets_page(active_only=active_only, limit=args.limit, before=args.before)
     
     elif args.command == 'get':
         get_market(args.id)
@@ -3,12 +3,23 @@ Fetch rewards data from Polymarket rewards page
 Gets real-time liquidity rewards information
 """
 
+import argparse
+import asyncio
+import os
+import aiohttp
 import requests
+import requests_cache
 import logging
-import json
 import re
+import orjson
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import List, Dict, Any
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 
 # Configure logging
 logging.basicConfig(
@@ -21,9 +32,104 @@ logger = logging.getLogger(__name__)
 # Polymarket rewards URL base
 REWARDS_URL_BASE = "https://polymarket.com/rewards?id=rate_per_day&desc=true&q="
 
+# Headers that mimic a browser request for the HTML pages
+HTML_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Max concurrent connections to polymarket.com when fetching HTML pages
+HTML_CONCURRENCY = 10
+
 # Polymarket rewards API endpoint
 REWARDS_API_URL = "https://polymarket.com/api/rewards/markets"
 
+# Output files are written through a 1 MiB buffer so streaming many small
+# writes turns into a handful of large write() syscalls
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Headers for the JSON API. The payload (many repeated field names) compresses
+# very well; ACCEPT_ENCODING lists every encoding urllib3 can decode here
+# (gzip/deflate, plus br/zstd when those packages are installed)
+API_HEADERS = {
+    'Accept': 'application/json',
+    'Accept-Encoding': ACCEPT_ENCODING,
+}
+
+# Cache for rewards responses: reruns within REWARDS_CACHE_TTL seconds are
+# served locally, and a failed refresh falls back to the stale copy
+REWARDS_CACHE_PATH = os.path.join('data', 'rewards_cache')
+REWARDS_CACHE_TTL = 300
+
+@lru_cache(maxsize=1)
+def _session() -> requests_cache.CachedSession:
+    """
+    Shared session for the sync fetchers: keep-alive connections are reused
+    across pages instead of paying a TCP+TLS handshake per request.
+    
+    Built on first use rather than at import, so importing this module (as
+    every process-pool parse worker does) does not create the data/ folder
+    or open the SQLite cache.
+    """
+    session = requests_cache.CachedSession(
+        REWARDS_CACHE_PATH,
+        backend='sqlite',
+        expire_after=REWARDS_CACHE_TTL,
+        stale_if_error=True,
+    )
+    session.mount('https://', HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        # Transient failures (rate limits, 5xx, dropped connections) are
+        # retried here with exponential backoff, honouring Retry-After; only
+        # errors that survive the retries reach the callers' exception handlers
+        max_retries=Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=['GET'],
+            respect_retry_after_header=True,
+        ),
+    ))
+    return session
+
+
+# The page's data lives in a single <script id="__NEXT_DATA__"> tag; pulling it
+# out with a regex avoids building a parse tree for the whole document
+_NEXT_DATA_RE = re.compile(
+    rb'<script[^>]*\bid="__NEXT_DATA__"[^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE
+)
+_TITLE_RE = re.compile(rb'<title[^>]*>(.*?)</title>', re.DOTALL | re.IGNORECASE)
+
+# Fields copied as-is from each rewards market object, with their default
+# when missing; parse_rewards_page adds the derived reward fields and tokens
+_MARKET_FIELDS = (
+    ('market_id', None),
+    ('condition_id', None),
+    ('question', None),
+    ('market_slug', None),
+    ('volume_24hr', 0),
+    ('rewards_max_spread', None),
+    ('rewards_min_size', None),
+    ('spread', None),
+    ('market_competitiveness', None),
+)
+
+
+def _rewards_page_url(page: int) -> str:
+    """
+    Build the rewards page URL for a page number.
+    
+    Base URL: https://polymarket.com/rewards?id=rate_per_day&desc=true&q=
+    The page parameter is only added for page > 1.
+    """
+    if page > 1:
+        return f"{REWARDS_URL_BASE}&page={page}"
+    return REWARDS_URL_BASE
+
 
 def fetch_rewards_html(page: int = 1):
     """
@@ -34,38 +140,23 @@ def fetch_rewards_html(page: int = 1):
         page: Page number to fetch (default: 1)
     
     Returns:
-        str: HTML content of the page, or None if error
+        bytes: Raw HTML of the page (UTF-8), or None if error
     """
     try:
-        # Build URL with page parameter
-        # Base URL: https://polymarket.com/rewards?id=rate_per_day&desc=true&q=
-        # Add page parameter if page > 1, otherwise use base URL as-is
-        if page > 1:
-            url = f"{REWARDS_URL_BASE}&page={page}"
-        else:
-            url = REWARDS_URL_BASE
+        url = _rewards_page_url(page)
         logger.info(f"Fetching rewards page {page} from: {url}")
         
-        # Set headers to mimic a browser request
-        # Note: requests library automatically handles gzip decompression
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        }
-        
         # Make request with timeout
         # requests automatically decompresses gzip/deflate/br if Accept-Encoding not set
-        response = requests.get(url, headers=headers, timeout=30)
+        response = _session().get(url, headers=HTML_HEADERS, timeout=30)
         response.raise_for_status()
         
-        # Ensure we got text content
-        response.encoding = response.apparent_encoding or 'utf-8'
-        html_content = response.text
+        # Return the raw bytes: the page is always UTF-8 and parse_rewards_page
+        # and save_rewards_html take bytes, so there is no need to run charset
+        # detection over the whole body just to build a str
+        html_content = response.content
         
-        logger.info(f"Successfully fetched page {page} ({len(html_content)} characters)")
+        logger.info(f"Successfully fetched page {page} ({len(html_content)} bytes)")
         
         return html_content
         
@@ -77,19 +168,83 @@ def fetch_rewards_html(page: int = 1):
         return None
 
 
+async def fetch_rewards_html_async(session: aiohttp.ClientSession, page: int = 1):
+    """
+    Fetch HTML content from Polymarket rewards page using an aiohttp session.
+    
+    Args:
+        session: Shared aiohttp session (carries the browser headers)
+        page: Page number to fetch (default: 1)
+    
+    Returns:
+        bytes: Raw HTML of the page, or None if error
+    """
+    try:
+        url = _rewards_page_url(page)
+        logger.info(f"Fetching rewards page {page} from: {url}")
+        
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
+            response.raise_for_status()
+            html_content = await response.read()
+        
+        logger.info(f"Successfully fetched page {page} ({len(html_content)} bytes)")
+        
+        return html_content
+        
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"Error fetching rewards page {page}: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Unexpected error on page {page}: {e}")
+        return None
+
+
+async def _fetch_and_parse_page(session: aiohttp.ClientSession, page: int, executor):
+    """Fetch one rewards page and parse it in a worker process."""
+    html = await fetch_rewards_html_async(session, page)
+    if not html:
+        return None
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, parse_rewards_page, html)
+
+
+async def fetch_all_rewards_pages_async(max_pages: int = 27) -> List[List[Dict[str, Any]]]:
+    """
+    Fetch and parse rewards pages 1..max_pages concurrently.
+    
+    Args:
+        max_pages: Number of pages to fetch (default: 27)
+    
+    Returns:
+        One entry per page, in page order: the page's markets, or None if
+        the page could not be fetched
+    """
+    # Parsing (regex + JSON decode of ~1MB payloads) is CPU-bound, so it runs
+    # in a process pool to use every core instead of contending for the GIL
+    workers = max(1, min(max_pages, os.cpu_count() or 1))
+    connector = aiohttp.TCPConnector(limit_per_host=HTML_CONCURRENCY)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        async with aiohttp.ClientSession(headers=HTML_HEADERS, connector=connector) as session:
+            return await asyncio.gather(
+                *[_fetch_and_parse_page(session, page, executor) for page in range(1, max_pages + 1)]
+            )
+
+
 def save_rewards_html(html_content, filename='rewards.html'):
     """
     Save HTML content to a file.
     
     Args:
-        html_content: HTML string to save
+        html_content: HTML to save (str or bytes)
         filename: Output filename (default: rewards.html)
     
     Returns:
         bool: True if saved successfully, False otherwise
     """
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
+        if isinstance(html_content, str):
+            html_content = html_content.encode('utf-8')
+        with open(filename, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
             f.write(html_content)
         logger.info(f"Saved rewards HTML to {filename}")
         return True
@@ -98,21 +253,19 @@ def save_rewards_html(html_content, filename='rewards.html'):
         return False
 
 
-def save_rewards_json(markets, filename=None):
+def save_rewards_json(markets, filename=None, pretty=False):
     """
     Save rewards market data to a JSON file in the data folder with a date.
     
     Args:
         markets: List of market dictionaries with reward info
         filename: Output filename (default: auto-generated with date in data folder)
+        pretty: Indent the output for reading by eye (default: compact)
     
     Returns:
         str: Path to saved file, or None if error
     """
     try:
-        import os
-        from datetime import datetime, timezone
-        
         # Create data directory if it doesn't exist
         data_dir = 'data'
         os.makedirs(data_dir, exist_ok=True)
@@ -123,15 +276,29 @@ def save_rewards_json(markets, filename=None):
             date_str = now.strftime('%Y-%m-%d')
             filename = os.path.join(data_dir, f'rewards_{date_str}.json')
         
-        # Add metadata
-        output = {
-            'fetched_at': datetime.now(timezone.utc).isoformat(),
-            'total_markets': len(markets),
-            'markets': markets
-        }
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        fetched_at = orjson.dumps(datetime.now(timezone.utc).isoformat())
+        option = orjson.OPT_NON_STR_KEYS
+        
+        # Stream the metadata and then one market at a time instead of
+        # serializing the whole document into a single buffer first
+        with open(filename, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+                f.write(b'{\n  "fetched_at": %s,\n  "total_markets": %d,\n  "markets": ['
+                        % (fetched_at, len(markets)))
+                for i, market in enumerate(markets):
+                    f.write(b',\n    ' if i else b'\n    ')
+                    f.write(orjson.dumps(market, option=option).replace(b'\n', b'\n    '))
+                f.write(b'\n  ]\n}' if markets else b']\n}')
+            else:
+                # Compact output: the file is machine-read by load_rewards_json
+                f.write(b'{"fetched_at":%s,"total_markets":%d,"markets":['
+                        % (fetched_at, len(markets)))
+                for i, market in enumerate(markets):
+                    if i:
+                        f.write(b',')
+                    f.write(orjson.dumps(market, option=option))
+                f.write(b']}')
         
         logger.info(f"Saved {len(markets)} markets to {filename}")
         return filename
@@ -141,6 +308,23 @@ def save_rewards_json(markets, filename=None):
         return None
 
 
+def _latest_rewards_file(data_dir, extension):
+    """
+    Return the name of the most recent rewards_*<extension> file in data_dir.
+    
+    Files sort by name, which includes the date, so this is a single pass
+    over the directory entries. Returns None if there is no such file.
+    """
+    if not os.path.isdir(data_dir):
+        return None
+    with os.scandir(data_dir) as entries:
+        return max(
+            (entry.name for entry in entries
+             if entry.name.startswith('rewards_') and entry.name.endswith(extension)),
+            default=None,
+        )
+
+
 def load_rewards_json(filename=None):
     """
     Load rewards market data from a JSON file.
@@ -154,26 +338,21 @@ def load_rewards_json(filename=None):
               Returns None if file doesn't exist or error occurs
     """
     try:
-        import os
-        import glob
-        
         # If no filename specified, find the most recent rewards file
         if filename is None:
             data_dir = 'data'
-            pattern = os.path.join(data_dir, 'rewards_*.json')
-            reward_files = glob.glob(pattern)
+            latest = _latest_rewards_file(data_dir, '.json')
             
-            if not reward_files:
+            if latest is None:
                 logger.warning(f"No rewards files found in {data_dir}/ folder")
                 logger.info("Run getrewards.py first to fetch rewards data")
                 return None
             
-            # Get the most recent file (sorted by filename, which includes date)
-            filename = max(reward_files)
+            filename = os.path.join(data_dir, latest)
             logger.info(f"Using most recent rewards file: {filename}")
         
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(filename, 'rb') as f:
+            data = orjson.loads(f.read())
         
         logger.info(f"Loaded {data.get('total_markets', 0)} markets from {filename}")
         logger.info(f"Data fetched at: {data.get('fetched_at', 'unknown')}")
@@ -188,37 +367,234 @@ def load_rewards_json(filename=None):
         return None
 
 
+def save_rewards_parquet(markets, filename=None):
+    """
+    Save rewards market data to a zstd-compressed Parquet file in the data folder.
+    
+    Columnar storage is much smaller than the JSON file and lets readers load
+    only the columns they need (see load_rewards_parquet). Nested fields
+    (rewards_config, tokens) are stored as JSON text.
+    
+    Args:
+        markets: List of market dictionaries with reward info
+        filename: Output filename (default: auto-generated with date in data folder)
+    
+    Returns:
+        str: Path to saved file, or None if error
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        data_dir = 'data'
+        os.makedirs(data_dir, exist_ok=True)
+        
+        if filename is None:
+            date_str = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+            filename = os.path.join(data_dir, f'rewards_{date_str}.parquet')
+        
+        # Build one list per column over the union of keys (markets missing a
+        # field get null); lists/dicts become JSON text so every column has a
+        # flat type
+        columns = {}
+        json_columns = set()
+        for index, market in enumerate(markets):
+            for key, value in market.items():
+                if isinstance(value, (list, dict)):
+                    json_columns.add(key)
+                    value = orjson.dumps(value).decode()
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [None] * len(markets)
+                column[index] = value
+        
+        table = pa.table(columns)
+        table = table.replace_schema_metadata({
+            'fetched_at': datetime.now(timezone.utc).isoformat(),
+            'json_columns': orjson.dumps(sorted(json_columns)),
+        })
+        pq.write_table(table, filename, compression='zstd')
+        
+        logger.info(f"Saved {len(markets)} markets to {filename}")
+        return filename
+        
+    except Exception as e:
+        logger.error(f"Error saving Parquet: {e}")
+        return None
+
+
+def load_rewards_parquet(filename=None, columns=None):
+    """
+    Load rewards market data from a Parquet file.
+    If no filename specified, loads the most recent rewards file from data folder.
+    
+    Args:
+        filename: Input filename (default: most recent in data folder)
+        columns: Only read these columns, e.g. ['market_id', 'reward_rate_usd']
+                 (default: all columns)
+    
+    Returns:
+        dict: Dictionary with 'fetched_at', 'total_markets', and 'markets' keys
+              (same shape as load_rewards_json)
+              Returns None if file doesn't exist or error occurs
+    """
+    try:
+        import pyarrow.parquet as pq
+        
+        if filename is None:
+            data_dir = 'data'
+            latest = _latest_rewards_file(data_dir, '.parquet')
+            
+            if latest is None:
+                logger.warning(f"No Parquet rewards files found in {data_dir}/ folder")
+                return None
+            
+            filename = os.path.join(data_dir, latest)
+            logger.info(f"Using most recent rewards file: {filename}")
+        
+        table = pq.read_table(filename, columns=columns)
+        metadata = table.schema.metadata or {}
+        json_columns = set(orjson.loads(metadata.get(b'json_columns', b'[]')))
+        
+        markets = table.to_pylist()
+        decode = [name for name in table.column_names if name in json_columns]
+        if decode:
+            for market in markets:
+                for name in decode:
+                    if market[name] is not None:
+                        market[name] = orjson.loads(market[name])
+        
+        data = {
+            'fetched_at': metadata.get(b'fetched_at', b'unknown').decode(),
+            'total_markets': len(markets),
+            'markets': markets,
+        }
+        
+        logger.info(f"Loaded {data['total_markets']} markets from {filename}")
+        logger.info(f"Data fetched at: {data['fetched_at']}")
+        
+        return data
+        
+    except FileNotFoundError:
+        logger.warning(f"Rewards file not found: {filename}")
+        return None
+    except Exception as e:
+        logger.error(f"Error loading Parquet: {e}")
+        return None
+
+
+def _extract_next_data(html_content):
+    """
+    Extract the raw __NEXT_DATA__ JSON payload from the rewards page.
+    
+    Uses a precompiled regex on the fast path and only falls back to a full
+    BeautifulSoup/lxml parse if the tag isn't found that way.
+    
+    Args:
+        html_content: HTML of the rewards page (bytes or str)
+    
+    Returns:
+        bytes: JSON payload of the script tag, or None if not found
+    """
+    if isinstance(html_content, str):
+        html_content = html_content.encode('utf-8')
+    
+    # Log page title to verify we got the right page
+    title = _TITLE_RE.search(html_content)
+    if title:
+        logger.info(f"Page title: {title.group(1).decode('utf-8', 'replace').strip()}")
+    
+    match = _NEXT_DATA_RE.search(html_content)
+    if match:
+        return match.group(1)
+    
+    logger.warning("__NEXT_DATA__ not matched by regex, falling back to full HTML parse")
+    soup = BeautifulSoup(html_content, 'lxml')
+    script_tag = soup.find('script', id='__NEXT_DATA__')
+    if not script_tag or script_tag.string is None:
+        return None
+    return script_tag.string.encode('utf-8')
+
+
+def _find_markets_data(queries):
+    """
+    Locate the markets list among the page's dehydrated react-query queries.
+    
+    Prefers the first rewards-related query whose state.data (or
+    state.data.data) is a list; failing that, falls back to the first query
+    of any kind whose state.data.data looks like a list of markets. Both are
+    resolved in a single pass over the queries.
+    
+    Args:
+        queries: props.pageProps.dehydratedState.queries from __NEXT_DATA__
+    
+    Returns:
+        list: The markets list, or None if nothing matched
+    """
+    rewards_seen = False
+    fallback = None
+    fallback_key = None
+    
+    for query in queries:
+        query_key = query.get('queryKey', [])
+        query_key_str = str(query_key) if query_key else ''
+        data = query.get('state', {}).get('data', {})
+        
+        # Look for rewards-related queries: state.data.data or state.data as a list
+        if not rewards_seen and ('/api/rewards' in query_key_str or 'rewards' in query_key_str.lower()):
+            if isinstance(data, dict) and isinstance(data.get('data'), list):
+                candidate, path = data['data'], 'state.data.data'
+            elif isinstance(data, list):
+                candidate, path = data, 'state.data'
+            else:
+                candidate = None
+            
+            if candidate is not None:
+                # Only the first matching rewards query is considered
+                rewards_seen = True
+                if candidate:
+                    logger.info(f"Found markets in {path} (query: {query_key_str[:100]})")
+                    return candidate
+        
+        # Remember the first query that merely looks like market data
+        if fallback is None and isinstance(data, dict):
+            potential_markets = data.get('data')
+            if isinstance(potential_markets, list) and potential_markets:
+                first_item = potential_markets[0]
+                if isinstance(first_item, dict) and ('question' in first_item or 'market_id' in first_item):
+                    fallback = potential_markets
+                    fallback_key = str(query_key)
+    
+    if fallback is not None:
+        logger.warning("Could not find markets in rewards queries, using first query that looks like markets")
+        logger.info(f"Found markets by searching all queries (query: {fallback_key[:100]})")
+    return fallback
+
+
 def parse_rewards_page(html_content):
     """
     Parse the rewards page HTML to extract market information.
     Extracts JSON data embedded in the Next.js page.
     
     Args:
-        html_content: HTML string from rewards page
+        html_content: HTML from rewards page (bytes or str)
     
     Returns:
         List of market dictionaries with reward info
     """
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Log page title to verify we got the right page
-        title = soup.find('title')
-        if title:
-            logger.info(f"Page title: {title.get_text()}")
-        
         # Find the Next.js data script tag
-        script_tag = soup.find('script', id='__NEXT_DATA__')
+        next_data_json = _extract_next_data(html_content)
         
-        if not script_tag:
+        if next_data_json is None:
             logger.error("Could not find __NEXT_DATA__ script tag")
             return []
         
         # Parse JSON data
         try:
-            next_data = json.loads(script_tag.string)
+            next_data = orjson.loads(next_data_json)
             logger.info("Successfully parsed Next.js data")
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Error parsing JSON: {e}")
             return []
         
@@ -227,54 +603,7 @@ def parse_rewards_page(html_content):
         try:
             queries = next_data['props']['pageProps']['dehydratedState']['queries']
             
-            # Find the query that contains market data
-            # Try multiple possible paths in the data structure
-            markets_data = None
-            
-            for query in queries:
-                query_key = query.get('queryKey', [])
-                query_key_str = str(query_key) if query_key else ''
-                
-                # Look for rewards-related queries
-                if '/api/rewards' in query_key_str or 'rewards' in query_key_str.lower():
-                    state = query.get('state', {})
-                    data = state.get('data', {})
-                    
-                    # Try multiple possible data paths
-                    if isinstance(data, dict):
-                        # Path 1: state.data.data (array)
-                        if 'data' in data and isinstance(data['data'], list):
-                            markets_data = data['data']
-                            logger.info(f"Found markets in state.data.data (query: {query_key_str[:100]})")
-                            break
-                        # Path 2: state.data (array directly)
-                        elif isinstance(data, list):
-                            markets_data = data
-                            logger.info(f"Found markets in state.data (query: {query_key_str[:100]})")
-                            break
-                    # Path 3: state.data is already a list
-                    elif isinstance(data, list):
-                        markets_data = data
-                        logger.info(f"Found markets directly in state.data (query: {query_key_str[:100]})")
-                        break
-            
-            # If still not found, try searching all queries more broadly
-            if not markets_data:
-                logger.warning("Could not find markets in rewards queries, searching all queries...")
-                for query in queries:
-                    state = query.get('state', {})
-                    data = state.get('data', {})
-                    
-                    # Check if this looks like market data
-                    if isinstance(data, dict) and 'data' in data:
-                        potential_markets = data.get('data', [])
-                        if isinstance(potential_markets, list) and len(potential_markets) > 0:
-                            # Check if first item looks like a market object
-                            first_item = potential_markets[0] if potential_markets else {}
-                            if isinstance(first_item, dict) and ('question' in first_item or 'market_id' in first_item):
-                                markets_data = potential_markets
-                                logger.info(f"Found markets by searching all queries (query: {str(query.get('queryKey', []))[:100]})")
-                                break
+            markets_data = _find_markets_data(queries)
             
             if not markets_data:
                 logger.error("Could not find markets data in JSON")
@@ -291,44 +620,28 @@ def parse_rewards_page(html_content):
                 if not isinstance(market, dict):
                     continue
                 
-                # Extract reward information from rewards_config
+                # Extract reward information from the first (active) rewards_config
                 rewards_config = market.get('rewards_config', [])
-                reward_rate_usd = 0
-                reward_total = 0
-                reward_asset = None
-                
-                if rewards_config and isinstance(rewards_config, list) and len(rewards_config) > 0:
-                    # Get the first (active) rewards config
-                    config = rewards_config[0]
-                    reward_rate_usd = config.get('rate_per_day', 0) or 0
-                    reward_total = config.get('total_rewards', 0) or 0
-                    reward_asset = config.get('asset_address')
-                
-                # Also check for direct reward fields (some markets might have different structure)
-                if reward_rate_usd == 0:
-                    reward_rate_usd = market.get('rate_per_day', 0) or 0
+                config = rewards_config[0] if rewards_config and isinstance(rewards_config, list) else {}
+                reward_total = config.get('total_rewards', 0) or 0
+                reward_asset = config.get('asset_address')
                 
-                # Also check for reward_rate_usd directly on the market
-                if reward_rate_usd == 0:
-                    reward_rate_usd = market.get('reward_rate_usd', 0) or 0
+                # Daily rate: first non-zero of the config's rate, then the direct
+                # fields some markets use instead
+                reward_rate_usd = next(
+                    (rate for rate in (config.get('rate_per_day'),
+                                       market.get('rate_per_day'),
+                                       market.get('reward_rate_usd')) if rate),
+                    0,
+                )
                 
                 # Extract all relevant market information
-                market_info = {
-                    'market_id': market.get('market_id'),
-                    'condition_id': market.get('condition_id'),
-                    'question': market.get('question'),
-                    'market_slug': market.get('market_slug'),
-                    'volume_24hr': market.get('volume_24hr', 0),
-                    'rewards_config': rewards_config,
-                    'reward_rate_usd': reward_rate_usd,  # USD per day (can be 0)
-                    'reward_total_usd': reward_total,  # Total rewards (if available)
-                    'reward_asset': reward_asset,  # Asset address (usually USDC)
-                    'rewards_max_spread': market.get('rewards_max_spread'),
-                    'rewards_min_size': market.get('rewards_min_size'),
-                    'spread': market.get('spread'),
-                    'market_competitiveness': market.get('market_competitiveness'),
-                    'tokens': market.get('tokens', [])
-                }
+                market_info = {key: market.get(key, default) for key, default in _MARKET_FIELDS}
+                market_info['rewards_config'] = rewards_config
+                market_info['reward_rate_usd'] = reward_rate_usd  # USD per day (can be 0)
+                market_info['reward_total_usd'] = reward_total  # Total rewards (if available)
+                market_info['reward_asset'] = reward_asset  # Asset address (usually USDC)
+                market_info['tokens'] = market.get('tokens', [])  # fresh default list per market
                 
                 # Include market even if reward_rate is 0 (they still appear on rewards page)
                 markets.append(market_info)
@@ -344,6 +657,53 @@ def parse_rewards_page(html_content):
         return []
 
 
+# Numeric and string columns produced by markets_to_arrays
+_NUMERIC_COLUMNS = (
+    'volume_24hr', 'reward_rate_usd', 'reward_total_usd',
+    'spread', 'rewards_max_spread', 'rewards_min_size', 'market_competitiveness',
+)
+_STRING_COLUMNS = ('market_id', 'condition_id', 'question', 'market_slug')
+
+
+def _to_float(value) -> float:
+    """Convert an API number (possibly a string or None) to float, NaN if unusable."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def markets_to_arrays(markets: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert a list of market dicts into a struct of column arrays.
+    
+    Numeric fields become float64 numpy arrays (NaN where missing) so
+    filtering and sorting can be vectorized, e.g.
+    ``mask = arrays['reward_rate_usd'] > 0``; identifier/text fields become
+    object arrays aligned with them.
+    
+    Args:
+        markets: List of market dictionaries (as returned by parse_rewards_page
+                 or fetch_all_rewards_pages)
+    
+    Returns:
+        dict: Column name -> numpy array, each of length len(markets)
+    """
+    import numpy as np
+    
+    count = len(markets)
+    arrays = {}
+    for column in _NUMERIC_COLUMNS:
+        arrays[column] = np.fromiter(
+            (_to_float(market.get(column)) for market in markets), dtype=np.float64, count=count
+        )
+    for column in _STRING_COLUMNS:
+        values = np.empty(count, dtype=object)
+        values[:] = [market.get(column) for market in markets]
+        arrays[column] = values
+    return arrays
+
+
 def fetch_rewards_api(limit: int = 100, cursor: str = None) -> Dict[str, Any]:
     """
     Fetch rewards data from the Polymarket API endpoint.
@@ -363,10 +723,13 @@ def fetch_rewards_api(limit: int = 100, cursor: str = None) -> Dict[str, Any]:
             params['cursor'] = cursor
         
         logger.info(f"Fetching from API: {REWARDS_API_URL}")
-        response = requests.get(REWARDS_API_URL, params=params, timeout=30)
+        response = _session().get(REWARDS_API_URL, params=params, headers=API_HEADERS, timeout=30)
         response.raise_for_status()
         
-        result = response.json()
+        if cursor is None:
+            logger.info(f"API Content-Encoding: {response.headers.get('Content-Encoding', 'identity')}")
+        
+        result = orjson.loads(response.content)
         logger.info(f"API returned {result.get('count', 0)} markets (total: {result.get('total_count', 0)})")
         
         return result
@@ -403,30 +766,38 @@ def fetch_all_rewards_pages(method: str = 'api', max_pages: int = 27) -> List[Di
     if method == 'api':
         # Use API with cursor-based pagination
         logger.info("Fetching all rewards via API...")
-        cursor = None
-        
-        while True:
-            result = fetch_rewards_api(limit=100, cursor=cursor)
-            
-            if not result or 'data' not in result:
-                logger.warning("API returned invalid response")
-                break
-            
-            markets = result.get('data', [])
-            if markets:
-                all_markets.extend(markets)
-                logger.info(f"Fetched {len(markets)} markets (total so far: {len(all_markets)})")
-            else:
-                logger.info("No more markets, reached end")
-                break
-            
-            # Check if there's a next page
-            next_cursor = result.get('next_cursor')
-            if not next_cursor:
-                logger.info("No next cursor, reached end")
-                break
+        # Pages are chained by cursor, so requests can't overlap each other;
+        # instead the next request is already in flight on a background thread
+        # while the current page is processed
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = executor.submit(fetch_rewards_api, limit=100, cursor=None)
             
-            cursor = next_cursor
+            while pending is not None:
+                result = pending.result()
+                pending = None
+                
+                if not result or 'data' not in result:
+                    logger.warning("API returned invalid response")
+                    break
+                
+                markets = result.get('data', [])
+                next_cursor = result.get('next_cursor')
+                
+                # Prefetch the next page before handling this one
+                if markets and next_cursor:
+                    pending = executor.submit(fetch_rewards_api, limit=100, cursor=next_cursor)
+                
+                if markets:
+                    all_markets.extend(markets)
+                    logger.info(f"Fetched {len(markets)} markets (total so far: {len(all_markets)})")
+                else:
+                    logger.info("No more markets, reached end")
+                    break
+                
+                # Check if there's a next page
+                if not next_cursor:
+                    logger.info("No next cursor, reached end")
+                    break
         
         logger.info(f"Total markets fetched via API: {len(all_markets)}")
         return all_markets
@@ -435,16 +806,14 @@ def fetch_all_rewards_pages(method: str = 'api', max_pages: int = 27) -> List[Di
         # Use HTML scraping method (fallback)
         logger.info(f"Fetching up to {max_pages} pages of rewards data via HTML...")
         
-        for page in range(1, max_pages + 1):
-            html = fetch_rewards_html(page)
-            
-            if not html:
+        # Fetch and parse every page concurrently, then combine them in page order
+        page_results = asyncio.run(fetch_all_rewards_pages_async(max_pages))
+        
+        for page, markets in enumerate(page_results, 1):
+            if markets is None:
                 logger.warning(f"Failed to fetch page {page}, stopping")
                 break
             
-            # Parse this page
-            markets = parse_rewards_page(html)
-            
             if markets:
                 all_markets.extend(markets)
                 logger.info(f"Page {page}: Found {len(markets)} markets (total so far: {len(all_markets)})")
@@ -460,8 +829,6 @@ def main():
     """
     Main function to fetch and display rewards page.
     """
-    import argparse
-    
     parser = argparse.ArgumentParser(
         description="Fetch rewards data from Polymarket rewards page",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -505,8 +872,9 @@ Examples:
     if markets:
         logger.info(f"\nSuccessfully extracted {len(markets)} total markets with rewards\n")
         
-        # Save to JSON file
+        # Save to JSON file, plus a columnar copy for analytics reads
         save_rewards_json(markets)
+        save_rewards_parquet(markets)
         
         # Display first 10 markets
         for i, market in enumerate(markets[:10], 1):
@@ -4,13 +4,19 @@ Fetches transaction history for a given trader address using the CLOB API
 and optionally saves it to a JSON file
 """
 
+import hashlib
+import os
 import sys
-import json
+import threading
+import numpy as np
+import orjson
 import toml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 from py_clob_client.client import ClobClient
-from py_clob_client.clob_types import TradeParams
+from py_clob_client.clob_types import ApiCreds, TradeParams
 
 
 # Load configuration
@@ -37,6 +43,14 @@ if not key:
     print("ERROR: private_key not found in settings.toml")
     sys.exit(1)
 
+# Derived API credentials are cached here, one file per (private key, chain)
+CREDS_CACHE_DIR = Path.home() / ".cache" / "polymarket_shared" / "creds"
+
+# Shared client, created on first use so repeated check_trader calls reuse it
+# (and its HTTP connection pool)
+_CLIENT: Optional[ClobClient] = None
+_CLIENT_LOCK = threading.Lock()
+
 
 def format_timestamp(ts):
     """Convert unix timestamp to readable date"""
@@ -46,19 +60,92 @@ def format_timestamp(ts):
         return ts
 
 
+def _creds_cache_path() -> Path:
+    """Cache file for the API credentials of the configured key and chain"""
+    digest = hashlib.sha256(f"{key}:{chain_id}".encode()).hexdigest()
+    return CREDS_CACHE_DIR / f"{digest}.json"
+
+
+def load_api_creds(client: ClobClient, refresh: bool = False) -> ApiCreds:
+    """
+    Load the API credentials from the disk cache, deriving them on a miss
+    
+    Deriving requires an EIP-712 signature and an HTTP round trip, so the
+    result is stored (owner read/write only) and reused by later runs.
+    
+    Args:
+        client: ClobClient created with the private key
+        refresh: Skip the cache and derive fresh credentials (overwriting
+                 the cached ones), e.g. after they were revoked
+    
+    Returns:
+        ApiCreds for the client
+    """
+    path = _creds_cache_path()
+    if not refresh:
+        try:
+            data = orjson.loads(path.read_bytes())
+            return ApiCreds(
+                api_key=data["api_key"],
+                api_secret=data["api_secret"],
+                api_passphrase=data["api_passphrase"],
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    
+    creds = client.create_or_derive_api_creds()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(orjson.dumps({
+                "api_key": creds.api_key,
+                "api_secret": creds.api_secret,
+                "api_passphrase": creds.api_passphrase,
+            }))
+    except OSError as e:
+        print(f"Warning: could not cache API credentials: {e}")
+    return creds
+
+
+def _is_auth_error(error: Exception) -> bool:
+    """True if a CLOB API error means the credentials were rejected"""
+    return getattr(error, 'status_code', None) in (401, 403)
+
+
 def initialize_client():
-    """Initialize a ClobClient for API access"""
-    if proxy_address:
-        client = ClobClient(host, key=key, chain_id=chain_id, signature_type=2, funder=proxy_address)
-    else:
-        client = ClobClient(host, key=key, chain_id=chain_id)
+    """Initialize a ClobClient for API access, reusing the shared instance"""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            if proxy_address:
+                client = ClobClient(host, key=key, chain_id=chain_id, signature_type=2, funder=proxy_address)
+            else:
+                client = ClobClient(host, key=key, chain_id=chain_id)
+            
+            client.set_api_creds(load_api_creds(client))
+            _CLIENT = client
+        return _CLIENT
+
+
+def trade_prices_and_sizes(trades: list):
+    """
+    Convert the trades' string prices and sizes to float64 arrays.
+    
+    Args:
+        trades: List of trade objects
     
-    client.set_api_creds(client.create_or_derive_api_creds())
-    return client
+    Returns:
+        Tuple of (prices, sizes) numpy arrays, aligned with trades
+    """
+    count = len(trades)
+    prices = np.fromiter((float(trade.get('price', 0)) for trade in trades), dtype=np.float64, count=count)
+    sizes = np.fromiter((float(trade.get('size', 0)) for trade in trades), dtype=np.float64, count=count)
+    return prices, sizes
 
 
 def get_trader_trades(client: ClobClient, address: str, market: str = None, 
-                      after: int = None, before: int = None) -> list:
+                      after: int = None, before: int = None, verbose: bool = True) -> list:
     """
     Get trade history for a specific trader address (both maker and taker)
     
@@ -68,133 +155,179 @@ def get_trader_trades(client: ClobClient, address: str, market: str = None,
         market: Optional market condition ID filter
         after: Optional unix timestamp - only trades after this time
         before: Optional unix timestamp - only trades before this time
+        verbose: If False, print nothing (progress or errors)
     
     Returns:
         List of trades
     """
+    # The API matches lowercase addresses; normalize once for both queries
+    address = address.lower()
+    
     try:
-        trades = []
-        
-        # Get trades where this address is the maker (provided liquidity)
-        print("  Fetching maker trades...")
+        # Trades where this address is the maker (provided liquidity) and
+        # where it is the taker (took liquidity)
         maker_params = TradeParams(
-            maker_address=address.lower(),
+            maker_address=address,
             market=market,
             after=after,
             before=before
         )
-        maker_trades = client.get_trades(params=maker_params)
-        if maker_trades:
-            # Add trader_side field to identify these as maker trades
-            for trade in maker_trades:
-                trade['trader_side'] = 'MAKER'
-            trades.extend(maker_trades)
-        
-        # Get trades where this address is the taker (took liquidity)
-        print("  Fetching taker trades...")
         taker_params = TradeParams(
-            taker_address=address.lower(),
+            taker_address=address,
             market=market,
             after=after,
             before=before
         )
-        taker_trades = client.get_trades(params=taker_params)
-        if taker_trades:
-            # Add trader_side field to identify these as taker trades
-            for trade in taker_trades:
-                trade['trader_side'] = 'TAKER'
-            trades.extend(taker_trades)
         
-        # Remove duplicates based on trade ID
-        unique_trades = {}
+        # The two queries are independent, so run them concurrently
+        if verbose:
+            print("  Fetching maker trades...")
+            print("  Fetching taker trades...")
+        params = {'MAKER': maker_params, 'TAKER': taker_params}
+        results = {}
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = {
+                side: executor.submit(client.get_trades, params=side_params)
+                for side, side_params in params.items()
+            }
+        for side, future in futures.items():
+            try:
+                results[side] = future.result()
+            except Exception as e:
+                results[side] = e
+        
+        # Cached credentials that were revoked or rotated are rejected with
+        # 401/403: derive fresh ones (rewriting the cache) and retry once
+        rejected = [side for side, result in results.items()
+                    if isinstance(result, Exception) and _is_auth_error(result)]
+        if rejected:
+            if verbose:
+                print("  API credentials rejected, deriving new ones...")
+            try:
+                with _CLIENT_LOCK:
+                    client.set_api_creds(load_api_creds(client, refresh=True))
+                for side in rejected:
+                    try:
+                        results[side] = client.get_trades(params=params[side])
+                    except Exception as e:
+                        results[side] = e
+            except Exception as e:
+                if verbose:
+                    print(f"Error refreshing API credentials: {e}")
+        
+        trades = []
+        for side, side_trades in results.items():
+            # A failure on one side still returns the other side's trades
+            if isinstance(side_trades, Exception):
+                if verbose:
+                    print(f"Error fetching {side.lower()} trades: {side_trades}")
+                continue
+            if side_trades:
+                # Add trader_side field to identify which side these trades are
+                for trade in side_trades:
+                    trade['trader_side'] = side
+                trades.extend(side_trades)
+        
+        # Remove duplicates based on trade ID, keeping maker trades first
+        seen = set()
+        unique_trades = []
         for trade in trades:
             trade_id = trade.get('id')
-            if trade_id and trade_id not in unique_trades:
-                unique_trades[trade_id] = trade
+            if not trade_id or trade_id in seen:
+                continue
+            seen.add(trade_id)
+            unique_trades.append(trade)
         
-        return list(unique_trades.values())
+        return unique_trades
             
     except Exception as e:
-        print(f"Error fetching trades: {e}")
+        if verbose:
+            print(f"Error fetching trades: {e}")
         return []
 
 
 def display_trades(trades: list, address: str):
     """Display trades in a readable format"""
-    print("\n" + "="*80)
-    print(f"TRADE HISTORY FOR TRADER")
-    print("="*80)
-    print(f"Address: {address}")
+    # Build the whole report and write it once, instead of a print() (and a
+    # stdout lock/flush) per field
+    lines = [
+        "",
+        "="*80,
+        "TRADE HISTORY FOR TRADER",
+        "="*80,
+        f"Address: {address}",
+    ]
     
     if trades:
-        print(f"\nFound {len(trades)} trade(s):\n")
+        lines.append(f"\nFound {len(trades)} trade(s):\n")
         
-        total_volume = 0
+        # Price * size for every trade in one vectorized pass; the total uses
+        # the same np.vdot as save_trades_to_json so the two always agree
+        prices, sizes = trade_prices_and_sizes(trades)
+        trade_values = prices * sizes
+        total_volume = float(np.vdot(prices, sizes))
         
         for i, trade in enumerate(trades, 1):
-            print(f"Trade #{i}")
-            print(f"  ID: {trade.get('id')}")
-            print(f"  Side: {trade.get('side')}")
-            print(f"  Type: {trade.get('type', 'N/A')}")
+            lines.append(
+                f"Trade #{i}\n"
+                f"  ID: {trade.get('id')}\n"
+                f"  Side: {trade.get('side')}\n"
+                f"  Type: {trade.get('type', 'N/A')}"
+            )
             
             # Market and asset info
-            print(f"  Market: {trade.get('market', 'N/A')}")
-            print(f"  Asset ID: {trade.get('asset_id', 'N/A')}")
+            lines.append(f"  Market: {trade.get('market', 'N/A')}")
+            lines.append(f"  Asset ID: {trade.get('asset_id', 'N/A')}")
             outcome = trade.get('outcome')
             if outcome:
-                print(f"  Outcome: {outcome}")
-            
-            # Trade details
-            price = float(trade.get('price', 0))
-            size = float(trade.get('size', 0))
-            trade_value = price * size
-            
-            print(f"  Price: ${price:.4f}")
-            print(f"  Size: {size:,.2f} shares")
-            print(f"  Total Value: ${trade_value:.2f}")
-            
-            total_volume += trade_value
+                lines.append(f"  Outcome: {outcome}")
             
-            # Status
-            print(f"  Status: {trade.get('status')}")
-            print(f"  Fee Rate: {trade.get('fee_rate_bps', 0)} bps")
+            # Trade details and status
+            lines.append(
+                f"  Price: ${prices[i - 1]:.4f}\n"
+                f"  Size: {sizes[i - 1]:,.2f} shares\n"
+                f"  Total Value: ${trade_values[i - 1]:.2f}\n"
+                f"  Status: {trade.get('status')}\n"
+                f"  Fee Rate: {trade.get('fee_rate_bps', 0)} bps"
+            )
             
             # Timing
             match_time = trade.get('match_time') or trade.get('timestamp')
             if match_time:
-                print(f"  Matched: {format_timestamp(match_time)}")
+                lines.append(f"  Matched: {format_timestamp(match_time)}")
             
             last_update = trade.get('last_update')
             if last_update:
-                print(f"  Last Update: {format_timestamp(last_update)}")
+                lines.append(f"  Last Update: {format_timestamp(last_update)}")
             
             # Transaction info
             tx_hash = trade.get('transaction_hash')
             if tx_hash:
-                print(f"  Transaction: {tx_hash}")
-                print(f"  View: https://polygonscan.com/tx/{tx_hash}")
+                lines.append(f"  Transaction: {tx_hash}")
+                lines.append(f"  View: https://polygonscan.com/tx/{tx_hash}")
             
             # Maker orders info
             maker_orders = trade.get('maker_orders', [])
             if maker_orders:
-                print(f"  Matched against {len(maker_orders)} maker order(s)")
+                lines.append(f"  Matched against {len(maker_orders)} maker order(s)")
             
-            print()
+            lines.append("")
         
         # Summary statistics
-        print("-"*80)
-        print("SUMMARY")
-        print(f"  Total Trades: {len(trades)}")
-        print(f"  Total Volume: ${total_volume:,.2f}")
-        print("-"*80)
+        lines.append("-"*80)
+        lines.append("SUMMARY")
+        lines.append(f"  Total Trades: {len(trades)}")
+        lines.append(f"  Total Volume: ${total_volume:,.2f}")
+        lines.append("-"*80)
         
     else:
-        print("\nNo trades found for this trader")
-        print("\nNote: This trader may not have any recorded trades, or the trades")
-        print("may have been executed on a different account.")
+        lines.append("\nNo trades found for this trader")
+        lines.append("\nNote: This trader may not have any recorded trades, or the trades")
+        lines.append("may have been executed on a different account.")
     
-    print("="*80)
-    print()
+    lines.append("="*80)
+    lines.append("")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def save_trades_to_json(trades: list, address: str, filename: str):
@@ -206,25 +339,27 @@ def save_trades_to_json(trades: list, address: str, filename: str):
         address: Trader address
         filename: Output filename
     """
-    # Calculate statistics
-    total_volume = sum(
-        float(trade.get('size', 0)) * float(trade.get('price', 0)) 
-        for trade in trades
-    )
-    
-    # Prepare output data structure
-    output_data = {
+    header = orjson.dumps({
         "trader_address": address,
         "fetched_at": datetime.now().isoformat(),
         "total_trades": len(trades),
-        "total_volume_usd": round(total_volume, 2),
-        "trades": trades
-    }
+    }, option=orjson.OPT_INDENT_2)
     
-    # Save to file
+    # Stream the trades one at a time; total_volume_usd comes after the
+    # trades, matching the file layout readers already expect
     try:
-        with open(filename, 'w') as f:
-            json.dump(output_data, f, indent=2, default=str)
+        # Total volume through the same vectorized path as display_trades
+        prices, sizes = trade_prices_and_sizes(trades)
+        total_volume = float(np.vdot(prices, sizes))
+        
+        with open(filename, 'wb') as f:
+            # Reopen the header object (drop its closing "\n}") to append the trades
+            f.write(header[:-2] + b',\n  "trades": [')
+            for i, trade in enumerate(trades):
+                f.write(b',\n    ' if i else b'\n    ')
+                f.write(orjson.dumps(trade, default=str, option=orjson.OPT_INDENT_2).replace(b'\n', b'\n    '))
+            f.write(b'\n  ],\n' if trades else b'],\n')
+            f.write(b'  "total_volume_usd": %s\n}' % orjson.dumps(round(total_volume, 2)))
         print(f"\nSaved {len(trades)} trades to: {filename}")
     except Exception as e:
         print(f"\nError saving to JSON: {e}")
@@ -265,16 +400,8 @@ def check_trader(address: str, market: str = None,
     client = initialize_client()
     
     # Get trades
-    if not quiet:
-        trades = get_trader_trades(client, address, market=market, after=after, before=before)
-    else:
-        # Suppress output when quiet
-        import io
-        from contextlib import redirect_stdout
-        
-        f = io.StringIO()
-        with redirect_stdout(f):
-            trades = get_trader_trades(client, address, market=market, after=after, before=before)
+    trades = get_trader_trades(client, address, market=market, after=after, before=before,
+                               verbose=not quiet)
     
     # Display results only if not quiet
     if not quiet:
@@ -292,55 +419,42 @@ def main():
     # Default trader address from your request
     TRADER_ADDRESS = "0xca85f4b9e472b542e1df039594eeaebb6d466bf2"
     
-    # Parse optional filters first
-    market_id = None
-    after_ts = None
-    before_ts = None
-    output_file = None
     quiet = True  # Default to quiet mode
     
-    if '--market' in sys.argv:
-        market_index = sys.argv.index('--market')
-        if market_index + 1 < len(sys.argv):
-            market_id = sys.argv[market_index + 1]
+    # Single pass over the arguments: --flag value pairs go into `flags`, the
+    # first positional argument overrides the trader address
+    flags = {}
+    address_arg = None
+    args = iter(sys.argv[1:])
+    for arg in args:
+        if arg in ('--verbose', '-v'):
+            quiet = False
+        elif arg.startswith('--'):
+            flags[arg] = next(args, None)
+        elif address_arg is None:
+            address_arg = arg
     
-    if '--after' in sys.argv:
-        after_index = sys.argv.index('--after')
-        if after_index + 1 < len(sys.argv):
-            try:
-                after_ts = int(sys.argv[after_index + 1])
-            except ValueError:
-                print("ERROR: --after must be a unix timestamp")
-                sys.exit(1)
-    
-    if '--before' in sys.argv:
-        before_index = sys.argv.index('--before')
-        if before_index + 1 < len(sys.argv):
-            try:
-                before_ts = int(sys.argv[before_index + 1])
-            except ValueError:
-                print("ERROR: --before must be a unix timestamp")
-                sys.exit(1)
+    if address_arg is not None:
+        TRADER_ADDRESS = address_arg
     
-    if '--output' in sys.argv:
-        output_index = sys.argv.index('--output')
-        if output_index + 1 < len(sys.argv):
-            output_file = sys.argv[output_index + 1]
+    market_id = flags.get('--market')
+    output_file = flags.get('--output')
     
-    if '--verbose' in sys.argv or '-v' in sys.argv:
-        quiet = False
+    after_ts = None
+    if flags.get('--after') is not None:
+        try:
+            after_ts = int(flags['--after'])
+        except ValueError:
+            print("ERROR: --after must be a unix timestamp")
+            sys.exit(1)
     
-    # Allow override from command line (first positional argument after script name)
-    # Skip script name and process args
-    i = 1
-    while i < len(sys.argv):
-        if sys.argv[i].startswith('--'):
-            # Skip flag and its value
-            i += 2
-        else:
-            # First non-flag argument is the address
-            TRADER_ADDRESS = sys.argv[i]
-            break
+    before_ts = None
+    if flags.get('--before') is not None:
+        try:
+            before_ts = int(flags['--before'])
+        except ValueError:
+            print("ERROR: --before must be a unix timestamp")
+            sys.exit(1)
     
     # Validate address format
     if not TRADER_ADDRESS.startswith('0x') or len(TRADER_ADDRESS) != 42:
@@ -348,9 +462,12 @@ def main():
         print("Address should start with 0x and be 42 characters long")
         sys.exit(1)
     
+    # Canonical lowercase form, used for the queries and the file name
+    TRADER_ADDRESS = TRADER_ADDRESS.lower()
+    
     # Auto-generate filename based on trader address if no output specified
     if not output_file:
-        output_file = f"trades_{TRADER_ADDRESS.lower()}.json"
+        output_file = f"trades_{TRADER_ADDRESS}.json"
     
     # Check the trader
     check_trader(TRADER_ADDRESS, market=market_id, after=after_ts, before=before_ts, output_file=output_file, quiet=quiet)
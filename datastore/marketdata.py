@@ -3,10 +3,20 @@ Market Data Functions for Polymarket
 Functions for fetching and managing market data from the CLOB and Gamma APIs
 """
 
+import hashlib
 import logging
+import os
+import threading
+import time
 import requests
-import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import chain
+from pathlib import Path
+from urllib.parse import urlencode
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Configure logging
 logging.basicConfig(
@@ -16,6 +26,183 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# (connect, read) timeout for every API request
+REQUEST_TIMEOUT = (3.05, 15)
+
+# Shared HTTP session: keep-alive connections are reused across calls and
+# paginated batches instead of paying a TCP+TLS handshake per request
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504]),
+)
+_SESSION.mount("http://", _adapter)
+_SESSION.mount("https://", _adapter)
+_SESSION.headers.update({"Accept-Encoding": "gzip", "User-Agent": "polymarket-shared/1.0"})
+
+# Max pages requested concurrently by the paginated batch fetchers
+PAGE_FETCH_WORKERS = 4
+
+# Response cache for the GET endpoints: in memory per process, plus JSON files
+# under CACHE_DIR so separate runs can reuse fresh responses. Each endpoint
+# picks its own TTL (seconds); setting POLYMARKET_CACHE_TTL overrides them
+# all, and POLYMARKET_CACHE_TTL=0 disables caching.
+CACHE_DIR = Path.home() / ".cache" / "polymarket_shared"
+EVENTS_CACHE_TTL = 10
+GAMMA_MARKETS_CACHE_TTL = 10
+CLOB_MARKETS_CACHE_TTL = 30
+MARKET_BY_SLUG_CACHE_TTL = 60
+
+_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+
+# market_slug -> market index for get_market_by_slug, and when it was built
+_SLUG_INDEX = None
+_SLUG_INDEX_AT = 0.0
+
+
+def _cache_ttl(default_ttl):
+    """Return the TTL to use: POLYMARKET_CACHE_TTL if set, else the endpoint's."""
+    override = os.environ.get("POLYMARKET_CACHE_TTL")
+    if override is None:
+        return default_ttl
+    try:
+        return float(override)
+    except ValueError:
+        return default_ttl
+
+
+def _cache_path(key):
+    """On-disk location of a cache entry."""
+    return CACHE_DIR / (hashlib.sha256(key.encode()).hexdigest()[:32] + ".json")
+
+
+def _write_cache_file(path, data):
+    """Write a cache file atomically so concurrent processes never read a partial one."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _cached_get(url, params=None, ttl=10):
+    """
+    GET a JSON endpoint through the TTL cache.
+    
+    The raw response body is cached and decoded with orjson on every call, so
+    callers get a fresh object they are free to mutate (decoding is cheaper
+    than deep-copying the parsed tree). A hit younger than `ttl` seconds (in
+    memory, or on disk from a previous run) skips the request. Once an entry
+    is stale it is revalidated with If-None-Match / If-Modified-Since, so an
+    unchanged catalog costs a 304 instead of a full download; otherwise the
+    new body replaces the cached one.
+    
+    Args:
+        url (str): Endpoint URL
+        params (dict): Query parameters
+        ttl (float): Maximum age of a usable cached response, in seconds
+    
+    Returns:
+        Decoded JSON response
+    
+    Raises:
+        requests.exceptions.RequestException: If the request fails
+    """
+    ttl = _cache_ttl(ttl)
+    key = url + "?" + urlencode(sorted((params or {}).items()))
+    path = _cache_path(key)
+    meta_path = path.with_suffix(".meta")
+    
+    # entry: (fetched_at, body, validators), validators being the ETag and
+    # Last-Modified response headers
+    entry = None
+    if ttl > 0:
+        now = time.time()
+        with _CACHE_LOCK:
+            entry = _CACHE.get(key)
+        
+        if entry is None:
+            try:
+                entry = (path.stat().st_mtime, path.read_bytes(), {})
+            except OSError:
+                entry = None
+            else:
+                try:
+                    entry[2].update(orjson.loads(meta_path.read_bytes()))
+                except (OSError, orjson.JSONDecodeError):
+                    pass
+                with _CACHE_LOCK:
+                    _CACHE[key] = entry
+        
+        if entry is not None and now - entry[0] < ttl:
+            try:
+                return orjson.loads(entry[1])
+            except orjson.JSONDecodeError:
+                entry = None
+    
+    headers = {}
+    if entry is not None:
+        validators = entry[2]
+        if validators.get("ETag"):
+            headers["If-None-Match"] = validators["ETag"]
+        if validators.get("Last-Modified"):
+            headers["If-Modified-Since"] = validators["Last-Modified"]
+    
+    response = _SESSION.get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+    
+    if response.status_code == 304 and entry is not None:
+        # Unchanged: keep the cached body and restart its TTL
+        body, validators = entry[1], entry[2]
+        with _CACHE_LOCK:
+            _CACHE[key] = (time.time(), body, validators)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return orjson.loads(body)
+    
+    response.raise_for_status()
+    # response.content is already gunzipped by urllib3; orjson skips the
+    # stdlib parser and requests' charset detection
+    body = response.content
+    data = orjson.loads(body)
+    
+    if ttl > 0:
+        validators = {
+            name: response.headers[name]
+            for name in ("ETag", "Last-Modified")
+            if response.headers.get(name)
+        }
+        with _CACHE_LOCK:
+            _CACHE[key] = (time.time(), body, validators)
+        
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            _write_cache_file(path, body)
+            if validators:
+                _write_cache_file(meta_path, orjson.dumps(validators))
+            elif meta_path.exists():
+                meta_path.unlink()
+        except OSError as e:
+            logger.debug(f"Could not write cache file for {url}: {e}")
+    
+    return data
+
+
+def clear_cache():
+    """Drop all cached API responses, in memory and on disk."""
+    global _SLUG_INDEX
+    with _CACHE_LOCK:
+        _CACHE.clear()
+    _SLUG_INDEX = None
+    if CACHE_DIR.is_dir():
+        for pattern in ("*.json", "*.meta"):
+            for path in CACHE_DIR.glob(pattern):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
 
 def fetch_active_markets_from_events(limit):
     """
@@ -34,33 +221,26 @@ def fetch_active_markets_from_events(limit):
         # Fetch events (events contain their associated markets)
         events = get_events(limit=limit, offset=0, closed=False, ascending=False)
         
-        # Extract markets from events
-        all_markets = []
         print("events length: ", len(events))
-        for event in events:
-            #print(event)
-            if 'markets' in event and event['markets']:
-                all_markets.extend(event['markets'])
-        
-        logger.info(f"Extracted {len(all_markets)} markets from events")
-        
-        # Filter for markets with order books enabled and active
-        active_markets = [
-            m for m in all_markets
-            if m.get('enableOrderBook') is True
-            and m.get('active') is True
-            and m.get('closed') is False
-            and m.get('archived') is False
-        ]
         
-        # Get the first 'limit' markets (newest first)
-        markets_to_monitor = active_markets[:limit]
+        # Extract and filter markets in one pass, stopping as soon as 'limit'
+        # markets (newest first) are selected; keep only markets with order
+        # books enabled and active
+        event_markets = chain.from_iterable(event.get('markets') or () for event in events)
+        markets_to_monitor = []
+        scanned = 0
+        for scanned, m in enumerate(event_markets, 1):
+            # Closed/archived markets are the common rejection, so test
+            # them first and let the rest short-circuit
+            if not (m.get('closed') or m.get('archived')) and m.get('active') and m.get('enableOrderBook'):
+                markets_to_monitor.append(m)
+                if len(markets_to_monitor) >= limit:
+                    break
         
         logger.info(f"Market filtering results:")
-        logger.info(f"  Total markets from events: {len(all_markets)}")
-        logger.info(f"  Active markets with order books: {len(active_markets)}")
-        logger.info(f"  Selected for monitoring: {len(markets_to_monitor)}")
-        logger.info(f"  Filtered out: {len(all_markets) - len(active_markets)} (inactive/closed/archived/no orderbook)")
+        logger.info(f"  Markets scanned from events: {scanned}")
+        logger.info(f"  Selected for monitoring (active with order books): {len(markets_to_monitor)}")
+        logger.info(f"  Filtered out: {scanned - len(markets_to_monitor)} (inactive/closed/archived/no orderbook)")
         
         # Log summary of markets we will monitor
         if markets_to_monitor:
@@ -92,10 +272,7 @@ def fetch_active_markets(limit=10, use_events=True):
             # Use CLOB API
             url = "https://clob.polymarket.com/markets"
             logger.info(f"Fetching markets from {url}...")
-            response = requests.get(url)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = _cached_get(url, ttl=CLOB_MARKETS_CACHE_TTL)
             all_markets = data.get('data', [])
             
             logger.info(f"Total markets fetched: {len(all_markets)}")
@@ -158,10 +335,7 @@ def fetch_all_markets():
     try:
         url = "https://clob.polymarket.com/markets"
         logger.info(f"Fetching all markets from {url}...")
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        data = response.json()
+        data = _cached_get(url, ttl=CLOB_MARKETS_CACHE_TTL)
         all_markets = data.get('data', [])
         
         logger.info(f"Fetched {len(all_markets)} markets")
@@ -182,21 +356,22 @@ def get_market_by_slug(market_slug):
     Returns:
         Market dictionary or None if not found
     """
+    global _SLUG_INDEX, _SLUG_INDEX_AT
     try:
-        url = "https://clob.polymarket.com/markets"
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        data = response.json()
-        all_markets = data.get('data', [])
+        # Rebuild the slug index from the market list once it is older than
+        # the TTL; lookups in between are a dict hit
+        if _SLUG_INDEX is None or time.time() - _SLUG_INDEX_AT >= _cache_ttl(MARKET_BY_SLUG_CACHE_TTL):
+            all_markets = fetch_all_markets()
+            index = {m['market_slug']: m for m in all_markets if m.get('market_slug')}
+            if not index:
+                logger.warning(f"Market not found: {market_slug}")
+                return None
+            _SLUG_INDEX, _SLUG_INDEX_AT = index, time.time()
         
-        # Find market by slug
-        for market in all_markets:
-            if market.get('market_slug') == market_slug:
-                return market
-        
-        logger.warning(f"Market not found: {market_slug}")
-        return None
+        market = _SLUG_INDEX.get(market_slug)
+        if market is None:
+            logger.warning(f"Market not found: {market_slug}")
+        return market
         
     except Exception as e:
         logger.error(f"Error fetching market: {e}")
@@ -276,9 +451,7 @@ def get_markets_gamma(active=True, limit=100, offset=0, closed=False, ascending=
     if tag_id:
         params["tag_id"] = tag_id
     
-    response = requests.get(url, params=params)
-    response.raise_for_status()
-    return response.json()
+    return _cached_get(url, params=params, ttl=GAMMA_MARKETS_CACHE_TTL)
 
 
 def get_events(limit=100, offset=0, closed=False, ascending=False):
@@ -318,9 +491,50 @@ def get_events(limit=100, offset=0, closed=False, ascending=False):
         "offset": offset
     }
     
-    response = requests.get(url, params=params)
-    response.raise_for_status()
-    return response.json()
+    return _cached_get(url, params=params, ttl=EVENTS_CACHE_TTL)
+
+
+def _iter_pages(fetch_page, total_items, page_size=100):
+    """
+    Yield consecutive API pages, fetching them concurrently in waves.
+    
+    Pages are requested PAGE_FETCH_WORKERS at a time on a thread pool and
+    yielded strictly in offset order. Page sizes cover `total_items` first
+    (the last one trimmed to fit) and continue at `page_size` for as long as
+    the caller keeps iterating; the caller decides when it has enough and
+    stops, which cancels any requests that haven't started yet.
+    
+    Args:
+        fetch_page: Callable (offset, limit) -> list of results for that page
+        total_items (int): Number of items the caller expects to need
+        page_size (int): Maximum results per request (API limit: 100)
+    
+    Yields:
+        tuple: (offset, batch_size, page results)
+    """
+    if total_items <= 0:
+        return
+    
+    offset = 0
+    with ThreadPoolExecutor(max_workers=PAGE_FETCH_WORKERS) as executor:
+        while True:
+            # Queue a wave of pages; a wave ends early at the page that
+            # reaches total_items so the first pass doesn't over-fetch
+            wave = []
+            while len(wave) < PAGE_FETCH_WORKERS:
+                remaining = total_items - offset
+                batch_size = min(page_size, remaining) if remaining > 0 else page_size
+                wave.append((offset, batch_size, executor.submit(fetch_page, offset, batch_size)))
+                offset += batch_size
+                if offset == total_items:
+                    break
+            
+            try:
+                for page_offset, batch_size, future in wave:
+                    yield page_offset, batch_size, future.result()
+            finally:
+                for _, _, future in wave:
+                    future.cancel()
 
 
 def get_markets_batch(filename="markets.json", total_markets=100, use_events=False):
@@ -348,57 +562,44 @@ def get_markets_batch(filename="markets.json", total_markets=100, use_events=Fal
     """
     logger.info(f"Fetching {total_markets} active markets using {'events' if use_events else 'markets'} endpoint...")
     
-    all_markets = []
-    limit = 100  # API limit per request
-    offset = 0
-    
-    # Fetch markets in batches of 100
-    while len(all_markets) < total_markets:
-        remaining = total_markets - len(all_markets)
-        batch_size = min(limit, remaining)
+    # Preallocate the expected slots; a page is copied in with one slice
+    # assignment (which grows the list if events overshoot) and the unused
+    # tail is trimmed at the end
+    all_markets = [None] * total_markets
+    count = 0
+    
+    if use_events:
+        # Use events endpoint for better market discovery
+        def fetch_page(offset, batch_size):
+            return get_events(limit=batch_size, offset=offset, closed=False, ascending=False)
+    else:
+        # Use markets endpoint for direct market queries
+        def fetch_page(offset, batch_size):
+            return get_markets_gamma(active=True, limit=batch_size, offset=offset, closed=False, ascending=False)
+    
+    # Fetch pages of up to 100 concurrently, consuming them in offset order
+    for offset, batch_size, batch in _iter_pages(fetch_page, total_markets):
+        logger.info(f"  Fetched batch: offset={offset}, limit={batch_size}")
         
-        logger.info(f"  Fetching batch: offset={offset}, limit={batch_size}...")
+        if not batch:
+            logger.info(f"  No more {'events' if use_events else 'markets'} available")
+            break
         
         if use_events:
-            # Use events endpoint for better market discovery
-            events_batch = get_events(
-                limit=batch_size,
-                offset=offset,
-                closed=False,
-                ascending=False
-            )
-            
-            if not events_batch:
-                logger.info("  No more events available")
-                break
-            
             # Extract markets from events
-            for event in events_batch:
-                if 'markets' in event and event['markets']:
-                    all_markets.extend(event['markets'])
+            markets = list(chain.from_iterable(event.get('markets') or () for event in batch))
         else:
-            # Use markets endpoint for direct market queries
-            markets_batch = get_markets_gamma(
-                active=True,
-                limit=batch_size,
-                offset=offset,
-                closed=False,
-                ascending=False
-            )
-            
-            if not markets_batch:
-                logger.info("  No more markets available")
-                break
-            
-            all_markets.extend(markets_batch)
+            markets = batch
+        all_markets[count:count + len(markets)] = markets
+        count += len(markets)
         
-        offset += batch_size
-        
-        # If we got fewer results than requested, we've reached the end
-        batch_result_count = len(events_batch) if use_events else len(markets_batch)
-        if batch_result_count < batch_size:
+        # Stop once we have enough, or if we got fewer results than
+        # requested (we've reached the end)
+        if count >= total_markets or len(batch) < batch_size:
             break
     
+    del all_markets[count:]
+    
     # Add timestamp to the data
     data = {
         "timestamp": datetime.now().isoformat(),
@@ -408,8 +609,8 @@ def get_markets_batch(filename="markets.json", total_markets=100, use_events=Fal
     }
     
     # Save to JSON file
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=2)
+    with open(filename, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
     
     logger.info(f"Saved {len(all_markets)} markets to {filename}")
     return all_markets
@@ -436,16 +637,9 @@ def get_markets_by_category(tag_id, filename=None, total_markets=100):
     logger.info(f"Fetching markets for category tag {tag_id}...")
     
     all_markets = []
-    limit = 100
-    offset = 0
     
-    while len(all_markets) < total_markets:
-        remaining = total_markets - len(all_markets)
-        batch_size = min(limit, remaining)
-        
-        logger.info(f"  Fetching markets {offset} to {offset + batch_size}...")
-        
-        markets_batch = get_markets_gamma(
+    def fetch_page(offset, batch_size):
+        return get_markets_gamma(
             active=True,
             limit=batch_size,
             offset=offset,
@@ -453,15 +647,18 @@ def get_markets_by_category(tag_id, filename=None, total_markets=100):
             ascending=False,
             tag_id=tag_id
         )
+    
+    # Fetch pages of up to 100 concurrently, consuming them in offset order
+    for offset, batch_size, markets_batch in _iter_pages(fetch_page, total_markets):
+        logger.info(f"  Fetched markets {offset} to {offset + batch_size}")
         
         if not markets_batch:
             logger.info("  No more markets available")
             break
         
         all_markets.extend(markets_batch)
-        offset += batch_size
         
-        if len(markets_batch) < batch_size:
+        if len(all_markets) >= total_markets or len(markets_batch) < batch_size:
             break
     
     logger.info(f"Fetched {len(all_markets)} markets for category {tag_id}")
@@ -474,8 +671,8 @@ def get_markets_by_category(tag_id, filename=None, total_markets=100):
             "tag_id": tag_id,
             "markets": all_markets
         }
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         logger.info(f"Saved markets to {filename}")
     
     return all_markets
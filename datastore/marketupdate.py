@@ -4,9 +4,15 @@ Continuously fetches and updates market data from Polymarket
 """
 
 import logging
+import queue
 import time
 import threading
+import orjson
+from collections import Counter
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Import market data helpers with compatibility for both package and script usage.
 try:
@@ -24,7 +30,12 @@ except ImportError:  # pragma: no cover - fallback for direct execution context
         get_markets_by_category,
     )
 
-from datastore import save_orderbook_to_db, save_market_to_db, get_db_connection
+from datastore import (
+    save_orderbooks_to_db,
+    build_orderbook_row,
+    save_market_to_db,
+    read_conn,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -34,28 +45,226 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+CLOB_BOOK_URL = "https://clob.polymarket.com/book"
+CLOB_BOOKS_URL = "https://clob.polymarket.com/books"
+
+# Concurrent CLOB requests per orderbook cycle
+ORDERBOOK_FETCH_WORKERS = 32
+
+# Shared HTTP session for the orderbook cycle: every request reuses a pooled
+# keep-alive connection instead of a fresh TCP+TLS handshake. All requests go
+# to the one CLOB host, and its pool holds one connection per worker so none
+# is discarded (and re-handshaken) when every worker is busy.
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=ORDERBOOK_FETCH_WORKERS,
+    max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504]),
+)
+_SESSION.mount("https://", _adapter)
+_SESSION.headers["Accept-Encoding"] = "gzip"
+
+# Tokens per POST /books request
+ORDERBOOK_BATCH_SIZE = 100
+
+# Fetched books are handed to a writer thread through a bounded queue; it
+# commits up to ORDERBOOK_WRITE_BATCH rows per transaction, waiting at most
+# ORDERBOOK_WRITE_LINGER seconds for a batch to fill
+ORDERBOOK_QUEUE_SIZE = 10000
+ORDERBOOK_WRITE_BATCH = 500
+ORDERBOOK_WRITE_LINGER = 0.2
+
+# Attempts per request when the CLOB answers 429, with exponential backoff
+# between them (honouring Retry-After when present)
+ORDERBOOK_MAX_ATTEMPTS = 4
+ORDERBOOK_BACKOFF = 0.5
+
+# Per-token errors that mean the CLOB is under stress; any of them in a cycle
+# doubles the polling interval
+TIMEOUT_ERROR = "Timeout"
+RATE_LIMITED_ERROR = "No orderbook (status: 429)"
+
+
+def _request_with_backoff(method, url, **kwargs):
+    """
+    Send a request on the shared session, retrying 429 responses.
+    
+    Args:
+        method: HTTP method ("GET" or "POST")
+        url: Request URL
+        **kwargs: Passed through to Session.request
+    
+    Returns:
+        requests.Response: The last response received
+    """
+    for attempt in range(ORDERBOOK_MAX_ATTEMPTS):
+        response = _SESSION.request(method, url, **kwargs)
+        if response.status_code != 429 or attempt == ORDERBOOK_MAX_ATTEMPTS - 1:
+            return response
+        try:
+            delay = float(response.headers.get("Retry-After", ""))
+        except ValueError:
+            delay = ORDERBOOK_BACKOFF * 2 ** attempt
+        time.sleep(delay)
+
+
+def _fetch_book(token_id):
+    """
+    Fetch one token's order book from the CLOB API.
+    
+    Runs on the orderbook worker threads; rate-limited (429) responses are
+    retried with exponential backoff.
+    
+    Args:
+        token_id: Token ID to fetch the book for
+    
+    Returns:
+        tuple: (orderbook_data, None) on success, (None, error message) otherwise
+    """
+    try:
+        response = _request_with_backoff("GET", CLOB_BOOK_URL, params={"token_id": token_id}, timeout=5)
+        
+        if response.status_code == 200:
+            return orjson.loads(response.content), None
+        return None, f"No orderbook (status: {response.status_code})"
+    
+    except requests.Timeout:
+        return None, TIMEOUT_ERROR
+    except requests.RequestException as e:
+        return None, f"Request error: {e}"
+    except Exception as e:
+        return None, f"Error: {e}"
+
+
+def _fetch_books(token_ids):
+    """
+    Fetch several tokens' order books with one POST /books request.
+    
+    Args:
+        token_ids: Token IDs to fetch (at most ORDERBOOK_BATCH_SIZE)
+    
+    Returns:
+        dict: token_id -> orderbook data for every book returned, or None if
+              the batch request failed and the tokens should be fetched one
+              by one instead
+    """
+    try:
+        response = _request_with_backoff(
+            "POST", CLOB_BOOKS_URL,
+            data=orjson.dumps([{"token_id": token_id} for token_id in token_ids]),
+            headers={"Content-Type": "application/json"},
+            timeout=10,
+        )
+        if response.status_code != 200:
+            logger.warning(f"Batch orderbook request failed (status: {response.status_code})")
+            return None
+        books = orjson.loads(response.content)
+    except Exception as e:
+        logger.warning(f"Batch orderbook request failed: {e}")
+        return None
+    
+    # Books carry their token as asset_id; match on it rather than on position
+    return {book.get('asset_id'): book for book in books if isinstance(book, dict)}
+
+
+def _parse_token_ids(market):
+    """
+    Decode a market's clobTokenIds (a JSON string in Gamma API responses).
+    
+    Args:
+        market: Market dictionary
+    
+    Returns:
+        list: Token IDs, empty if missing or unparseable
+    """
+    token_ids = market.get('clobTokenIds') or []
+    if isinstance(token_ids, str):
+        try:
+            token_ids = orjson.loads(token_ids)
+        except orjson.JSONDecodeError:
+            return []
+    return token_ids
+
+
+def _book_fingerprint(orderbook_data):
+    """
+    Hash the parts of an order book that change when the book does.
+    
+    The API timestamp is left out, so an unchanged book polled again gets
+    the same fingerprint.
+    
+    Args:
+        orderbook_data: Order book from the CLOB API
+    
+    Returns:
+        int: Fingerprint of the book's levels and settings
+    """
+    return hash((
+        tuple((level.get('price'), level.get('size')) for level in orderbook_data.get('bids') or ()),
+        tuple((level.get('price'), level.get('size')) for level in orderbook_data.get('asks') or ()),
+        orderbook_data.get('min_order_size'),
+        orderbook_data.get('tick_size'),
+        orderbook_data.get('neg_risk'),
+    ))
+
 
 class MarketUpdateService:
     """
     Service that continuously fetches and updates market data.
     """
     
-    def __init__(self, events_interval=60, orderbook_interval=30, update_orderbooks=True):
+    # Fixed SQL text, so every call hits the connection's prepared-statement
+    # cache instead of re-parsing
+    MARKET_IDS_SQL = "SELECT id FROM markets"
+    MARKET_STATUS_COUNTS_SQL = """
+        SELECT
+            COUNT(*),
+            COALESCE(SUM(active = 1), 0),
+            COALESCE(SUM(active = 0), 0),
+            COALESCE(SUM(closed = 1), 0),
+            COALESCE(SUM(archived = 1), 0)
+        FROM markets
+    """
+    
+    def __init__(self, events_interval=60, orderbook_interval=30, update_orderbooks=True,
+                 max_interval=600):
         """
         Initialize the market update service.
         
+        The intervals are minimums: a loop doubles its interval (up to
+        max_interval) after a cycle that was rate limited or failed, and
+        halves it back towards the minimum after each clean cycle.
+        
         Args:
             events_interval: Seconds between event updates (default: 60)
             orderbook_interval: Seconds between orderbook updates (default: 30)
             update_orderbooks: If True, also update orderbook data (default: True)
+            max_interval: Upper bound for the backed-off intervals (default: 600)
         """
         self.events_interval = events_interval
         self.orderbook_interval = orderbook_interval
+        self.max_interval = max_interval
+        self._events_backoff = events_interval
+        self._orderbook_backoff = orderbook_interval
         self.update_orderbooks = update_orderbooks
         self.running = False
         self.events_thread = None
         self.orderbook_thread = None
         self.markets = []
+        # IDs of markets known to be stored, mirrored in memory so the events
+        # cycle can tell new markets from existing ones without querying
+        self._known_ids = None
+        # market id -> parsed clobTokenIds for the current market list, so
+        # the orderbook cycle doesn't re-decode them every run
+        self._token_ids = {}
+        # token id -> fingerprint of the last book stored for it; books that
+        # haven't changed since are not written again
+        self._last_book_hash = {}
+        # Orderbook rows waiting for the writer thread, and how many it has
+        # stored so far
+        self._write_q = queue.Queue(maxsize=ORDERBOOK_QUEUE_SIZE)
+        self._writer_thread = None
+        self._orderbooks_written = 0
         self.lock = threading.Lock()
         
         logger.info(f"Market Update Service initialized")
@@ -63,6 +272,22 @@ class MarketUpdateService:
         logger.info(f"  Orderbook update interval: {orderbook_interval}s")
         logger.info(f"  Update orderbooks: {update_orderbooks}")
     
+    def _next_interval(self, current, minimum, throttled):
+        """
+        Adapt a polling interval to the outcome of the last cycle.
+        
+        Args:
+            current: Interval used for the last cycle
+            minimum: Configured interval for the loop
+            throttled: Whether the last cycle hit rate limits/timeouts/errors
+        
+        Returns:
+            float: Interval to sleep before the next cycle
+        """
+        if throttled:
+            return min(self.max_interval, current * 2)
+        return max(minimum, current / 2)
+    
     def start(self):
         """
         Start the market update service in background threads.
@@ -73,6 +298,11 @@ class MarketUpdateService:
         
         # Log existing market count at startup
         self._log_existing_market_count()
+        if logger.isEnabledFor(logging.DEBUG):
+            self._log_query_plans()
+        known_ids = self._load_known_ids()
+        with self.lock:
+            self._known_ids = known_ids
         
         self.running = True
         
@@ -83,6 +313,7 @@ class MarketUpdateService:
         
         # Start orderbook update thread if enabled
         if self.update_orderbooks:
+            self._ensure_writer()
             self.orderbook_thread = threading.Thread(target=self._orderbook_loop, daemon=True)
             self.orderbook_thread.start()
             logger.info("Orderbook update thread started")
@@ -105,6 +336,11 @@ class MarketUpdateService:
         if self.orderbook_thread:
             self.orderbook_thread.join(timeout=5)
         
+        # Let the writer store whatever is queued, then exit
+        if self._writer_thread and self._writer_thread.is_alive():
+            self._write_q.put(None)
+            self._writer_thread.join(timeout=5)
+        
         logger.info("Market update service stopped")
     
     def _log_existing_market_count(self):
@@ -112,27 +348,10 @@ class MarketUpdateService:
         Log how many markets are already known in the database.
         """
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Get total count
-            cursor.execute("SELECT COUNT(*) FROM markets")
-            total_count = cursor.fetchone()[0]
-            
-            # Get breakdown by status
-            cursor.execute("SELECT COUNT(*) FROM markets WHERE active = 1")
-            active_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM markets WHERE active = 0")
-            inactive_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM markets WHERE closed = 1")
-            closed_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM markets WHERE archived = 1")
-            archived_count = cursor.fetchone()[0]
-            
-            conn.close()
+            # Total and per-status counts in a single pass over the table
+            with read_conn() as conn:
+                row = conn.execute(self.MARKET_STATUS_COUNTS_SQL).fetchone()
+            total_count, active_count, inactive_count, closed_count, archived_count = row
             
             logger.info(f"Database market breakdown:")
             logger.info(f"  Total markets: {total_count}")
@@ -143,29 +362,35 @@ class MarketUpdateService:
             
         except Exception as e:
             logger.warning(f"Could not count existing markets: {e}")
-            try:
-                conn.close()
-            except Exception:
-                pass
 
-    def _market_exists(self, market_id):
+    def _log_query_plans(self):
         """
-        Check if a market already exists in the database.
+        Log SQLite's plan for the service's queries, to confirm index use.
         """
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM markets WHERE id = ?", (market_id,))
-            row = cursor.fetchone()
-            conn.close()
-            return row is not None
+            with read_conn() as conn:
+                for sql, params in (
+                    (self.MARKET_IDS_SQL, ()),
+                    (self.MARKET_STATUS_COUNTS_SQL, ()),
+                ):
+                    plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+                    logger.debug("Query plan for %s: %s", " ".join(sql.split()), "; ".join(row[-1] for row in plan))
         except Exception as e:
-            logger.warning(f"Could not check existence for market {market_id}: {e}")
-            try:
-                conn.close()
-            except Exception:
-                pass
-            return False
+            logger.debug("Could not explain queries: %s", e)
+
+    def _load_known_ids(self):
+        """
+        Load the IDs of every market already in the database.
+        
+        Returns:
+            set: Stored market IDs (empty if the database can't be read)
+        """
+        try:
+            with read_conn() as conn:
+                return {row[0] for row in conn.execute(self.MARKET_IDS_SQL)}
+        except Exception as e:
+            logger.warning(f"Could not load existing market ids: {e}")
+            return set()
 
     def _events_loop(self):
         """
@@ -177,18 +402,78 @@ class MarketUpdateService:
             try:                
                 # Fetch latest markets from events endpoint
                 logger.info("Updating markets from events endpoint...")
-                self.update_from_events(limit=10000)
+                updated = self.update_from_events(limit=10000)
                 
-                # Sleep until next update
-                time.sleep(self.events_interval)
+                # Sleep until next update, backing off while updates fail
+                self._events_backoff = self._next_interval(
+                    self._events_backoff, self.events_interval, throttled=not updated
+                )
+                if self._events_backoff != self.events_interval:
+                    logger.info(f"Next events update in {self._events_backoff:.0f}s")
+                time.sleep(self._events_backoff)
                 
             except Exception as e:
                 logger.error(f"Error in events update loop: {e}")
                 # Continue running even if there's an error
-                time.sleep(self.events_interval)
+                time.sleep(self._events_backoff)
         
         logger.info("Events update loop stopped")
     
+    def _ensure_writer(self):
+        """
+        Start the orderbook writer thread if it isn't running.
+        """
+        with self.lock:
+            if self._writer_thread is None or not self._writer_thread.is_alive():
+                self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+                self._writer_thread.start()
+    
+    def _writer_loop(self):
+        """
+        Orderbook writer loop that runs in background thread.
+        
+        Drains the write queue in batches of up to ORDERBOOK_WRITE_BATCH rows
+        (or whatever arrived within ORDERBOOK_WRITE_LINGER seconds) and
+        stores each batch in one transaction, so fetching never waits on the
+        database. A None item stops the loop.
+        """
+        logger.info("Orderbook writer thread started")
+        
+        stopping = False
+        while not stopping:
+            item = self._write_q.get()
+            if item is None:
+                self._write_q.task_done()
+                break
+            
+            batch = [item]
+            deadline = time.monotonic() + ORDERBOOK_WRITE_LINGER
+            while len(batch) < ORDERBOOK_WRITE_BATCH:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._write_q.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            try:
+                saved = save_orderbooks_to_db([row for row, _, _ in batch])
+                # Only remember books that actually reached the database
+                if saved:
+                    self._last_book_hash.update((token_id, fingerprint) for _, token_id, fingerprint in batch)
+                with self.lock:
+                    self._orderbooks_written += saved
+            finally:
+                for _ in range(len(batch) + stopping):
+                    self._write_q.task_done()
+        
+        logger.info("Orderbook writer thread stopped")
+    
     def _orderbook_loop(self):
         """
         Orderbook update loop that runs in background thread.
@@ -199,19 +484,25 @@ class MarketUpdateService:
             try:
                 # Get current markets and update orderbooks
                 markets = self.get_markets()
+                throttled = False
                 if markets:
                     logger.info("Updating orderbooks...")
-                    self._update_orderbooks(markets)
+                    throttled = self._update_orderbooks(markets)
                 else:
                     logger.info("No markets available for orderbook update")
                 
-                # Sleep until next update
-                time.sleep(self.orderbook_interval)
+                # Sleep until next update, backing off while the CLOB throttles
+                self._orderbook_backoff = self._next_interval(
+                    self._orderbook_backoff, self.orderbook_interval, throttled
+                )
+                if self._orderbook_backoff != self.orderbook_interval:
+                    logger.info(f"Next orderbook update in {self._orderbook_backoff:.0f}s")
+                time.sleep(self._orderbook_backoff)
                 
             except Exception as e:
                 logger.error(f"Error in orderbook update loop: {e}")
                 # Continue running even if there's an error
-                time.sleep(self.orderbook_interval)
+                time.sleep(self._orderbook_backoff)
         
         logger.info("Orderbook update loop stopped")
     
@@ -222,80 +513,134 @@ class MarketUpdateService:
         
         Args:
             markets: List of market dictionaries
+        
+        Returns:
+            bool: True if any request was rate limited or timed out
         """
+        throttled = False
         try:
             logger.info("\n" + "="*60)
             logger.info("ORDERBOOK UPDATE - Starting orderbook update")
             logger.info("="*60)
             
-            total_tokens = 0
-            successful_updates = 0
+            # Closed/archived/inactive markets have no live book to fetch
+            total_markets = len(markets)
+            markets = [
+                m for m in markets
+                if m.get('active') and not m.get('closed') and not m.get('archived')
+            ]
+            logger.info(f"Markets with live orderbooks: {len(markets)}/{total_markets}")
+            
+            unchanged = 0
             
+            # Fetched books are queued for the writer thread
+            self._ensure_writer()
+            with self.lock:
+                written_before = self._orderbooks_written
+            
+            # Collect every (market, token) pair first, then fetch each
+            # distinct token once, concurrently over the shared session; a
+            # token shared by several markets is stored against each of them
+            with self.lock:
+                parsed_token_ids = self._token_ids
+            
+            token_refs = {}
             for i, market in enumerate(markets, 1):
                 market_id = market.get('id', 'Unknown')
-                question = market.get('question', 'Unknown')
                 
-                # Parse clobTokenIds from Gamma API
-                import json
-                clob_token_ids = market.get('clobTokenIds', '[]')
-                try:
-                    token_ids = json.loads(clob_token_ids) if isinstance(clob_token_ids, str) else clob_token_ids
-                    outcomes = json.loads(market.get('outcomes', '[]')) if isinstance(market.get('outcomes'), str) else market.get('outcomes', [])
-                except:
-                    token_ids = []
-                    outcomes = []
-                
-                # Log progress every 50 markets
-                if i % 50 == 0 or i == len(markets):
-                    logger.info(f"Updating orderbooks - market {i}/{len(markets)}: {question[:60]}...")
+                # clobTokenIds were parsed when the market list was fetched
+                token_ids = parsed_token_ids.get(market_id)
+                if token_ids is None:
+                    token_ids = _parse_token_ids(market)
                 
-                # Fetch orderbook for each token
                 for j, token_id in enumerate(token_ids):
-                    outcome = outcomes[j] if j < len(outcomes) else f"Outcome {j+1}"
-                    
                     if not token_id:
                         continue
-                    
-                    total_tokens += 1
-                    
-                    # Fetch orderbook from CLOB API
-                    url = "https://clob.polymarket.com/book"
-                    params = {"token_id": token_id}
-                    
-                    try:
-                        response = requests.get(url, params=params, timeout=5)
-                        
-                        if response.status_code == 200:
-                            orderbook_data = response.json()
-                            
-                            # Count bids and asks
-                            bids = orderbook_data.get('bids', [])
-                            asks = orderbook_data.get('asks', [])
-                            
-                            # Save to database
-                            if save_orderbook_to_db(market_id, token_id, orderbook_data):
-                                successful_updates += 1
-                        else:
-                            logger.warning(f"Market {i} token {j+1}: No orderbook (status: {response.status_code})")
-                    
-                    except requests.Timeout:
-                        logger.warning(f"Market {i} token {j+1}: Timeout")
-                    except requests.RequestException as e:
-                        logger.warning(f"Market {i} token {j+1}: Request error: {e}")
-                    except Exception as e:
-                        logger.warning(f"Market {i} token {j+1}: Error: {e}")
+                    refs = token_refs.setdefault(token_id, [])
+                    # A token listed twice by the same market is stored once
+                    if all(ref[2] != market_id for ref in refs):
+                        refs.append((i, j, market_id))
+            
+            tokens = list(token_refs)
+            total_tokens = sum(len(refs) for refs in token_refs.values())
+            logger.info(
+                f"Fetching orderbooks for {len(tokens)} distinct tokens "
+                f"({total_tokens} market tokens) across {len(markets)} markets..."
+            )
+            
+            done = 0
+            failures = Counter()
+            def record(token_id, orderbook_data, error):
+                """Queue one fetched book for the writer thread and log progress."""
+                nonlocal done, throttled, unchanged
+                refs = token_refs[token_id]
+                
+                if orderbook_data is None:
+                    # Failures are tallied and summarized once per cycle; the
+                    # per-token detail is only formatted when debugging
+                    failures[error] += len(refs)
+                    for i, j, _ in refs:
+                        logger.debug("Market %d token %d: %s", i, j + 1, error)
+                    if error in (TIMEOUT_ERROR, RATE_LIMITED_ERROR):
+                        throttled = True
+                elif self._last_book_hash.get(token_id) == (fingerprint := _book_fingerprint(orderbook_data)):
+                    unchanged += len(refs)
+                else:
+                    for _, _, market_id in refs:
+                        self._write_q.put((build_orderbook_row(market_id, token_id, orderbook_data), token_id, fingerprint))
+                
+                # Log progress every 100 tokens
+                done += 1
+                if done % 100 == 0 or done == len(tokens):
+                    logger.info(f"Updating orderbooks - token {done}/{len(tokens)}")
+            
+            # Fetch the books in POST /books batches, several at a time; a cycle
+            # is only a handful of requests, so size the pool to match
+            batches = [tokens[k:k + ORDERBOOK_BATCH_SIZE] for k in range(0, len(tokens), ORDERBOOK_BATCH_SIZE)]
+            
+            fallback = []
+            with ThreadPoolExecutor(max_workers=max(1, min(ORDERBOOK_FETCH_WORKERS, len(batches)))) as executor:
+                futures = {executor.submit(_fetch_books, batch): batch for batch in batches}
+                
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    books = future.result()
+                    if books is None:
+                        fallback.extend(batch)
+                        continue
+                    for token_id in batch:
+                        book = books.get(token_id)
+                        record(token_id, book, None if book is not None else "No orderbook (not in batch response)")
+            
+            # Tokens from failed batches fall back to one /book request each
+            if fallback:
+                logger.info(f"Fetching {len(fallback)} orderbooks individually...")
+                with ThreadPoolExecutor(max_workers=min(ORDERBOOK_FETCH_WORKERS, len(fallback))) as executor:
+                    futures = {executor.submit(_fetch_book, token_id): token_id for token_id in fallback}
+                    for future in as_completed(futures):
+                        record(futures[future], *future.result())
+            
+            # Wait for the writer to store this cycle's books
+            self._write_q.join()
+            with self.lock:
+                successful_updates = self._orderbooks_written - written_before
             
             logger.info("\n" + "="*60)
             logger.info(f"ORDERBOOK UPDATE COMPLETE")
             logger.info(f"  Total tokens: {total_tokens}")
             logger.info(f"  Successful updates: {successful_updates}")
-            logger.info(f"  Failed: {total_tokens - successful_updates}")
+            logger.info(f"  Unchanged (not rewritten): {unchanged}")
+            logger.info(f"  Failed: {total_tokens - successful_updates - unchanged}")
+            for error, count in failures.most_common():
+                logger.warning("    %s: %d token(s)", error, count)
             logger.info("="*60)
             
         except Exception as e:
             logger.error(f"Error updating orderbooks: {e}")
             import traceback
             logger.error(traceback.format_exc())
+        
+        return throttled
     
     def get_markets(self):
         """
@@ -313,36 +658,58 @@ class MarketUpdateService:
         
         Args:
             limit: Number of markets to fetch
+        
+        Returns:
+            bool: True if markets were fetched, False if the update failed
         """
         try:
             logger.info(f"Updating markets from events endpoint (limit: {limit})...")
             new_markets = fetch_active_markets_from_events(limit=limit)
             
+            with self.lock:
+                known_ids = self._known_ids
+            if known_ids is None:
+                known_ids = self._load_known_ids()
+                with self.lock:
+                    self._known_ids = known_ids
+            
             # Save markets to database and count new vs existing
             saved_count = 0
             new_count = 0
             existing_count = 0
+            saved_ids = []
             for market in new_markets:
                 market_id = market.get('id')
-                known_before = self._market_exists(market_id) if market_id else False
+                known_before = market_id in known_ids
                 if save_market_to_db(market):
                     saved_count += 1
                     if known_before:
                         existing_count += 1
                     else:
                         new_count += 1
+                        if market_id:
+                            saved_ids.append(market_id)
+            
+            with self.lock:
+                self._known_ids.update(saved_ids)
             
             logger.info(
                 f"Saved {saved_count}/{len(new_markets)} markets to database (new: {new_count}, existing: {existing_count})"
             )
             
+            token_ids = {market.get('id'): _parse_token_ids(market) for market in new_markets}
+            
             with self.lock:
                 self.markets = new_markets
+                self._token_ids = token_ids
             
             logger.info(f"Events markets updated: {len(new_markets)} markets")
+            # fetch_active_markets_from_events returns [] when the request fails
+            return bool(new_markets)
             
         except Exception as e:
             logger.error(f"Error updating events markets: {e}")
+            return False
     
     def update_by_category(self, tag_id, limit=10):
         """
@@ -356,8 +723,11 @@ class MarketUpdateService:
             logger.info(f"Updating markets for category {tag_id} (limit: {limit})...")
             new_markets = get_markets_by_category(tag_id=tag_id, total_markets=limit)
             
+            token_ids = {market.get('id'): _parse_token_ids(market) for market in new_markets}
+            
             with self.lock:
                 self.markets = new_markets
+                self._token_ids = token_ids
             
             logger.info(f"Category markets updated: {len(new_markets)} markets")
             
@@ -1,19 +1,40 @@
 # /// script
 # requires-python = ">=3.12"
 # dependencies = [
-#     "requests"
+#     "requests",
+#     "orjson"
 # ]
 # ///
 
 import requests
-import json
+import orjson
 import os
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datastore import get_markets, save_orderbook_to_db
 
 GAMMA_API_URL = "https://gamma-api.polymarket.com"
 CLOB_URL = "https://clob.polymarket.com"
 DATA_DIR = "data"
 
+# Shared HTTP session so successive /book calls reuse keep-alive connections
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504]),
+)
+_SESSION.mount("https://", _adapter)
+_SESSION.headers["Accept-Encoding"] = "gzip"
+
+# Concurrent /book probes when searching for a market with an order book
+PROBE_WORKERS = 16
+
+# Also write each fetched book to a pretty-printed JSON file under DATA_DIR
+# (for debugging); by default books only go to the database
+WRITE_SNAPSHOT_FILES = os.environ.get("POLYMARKET_ORDERBOOK_FILES", "") == "1"
+
 
 def fetch_markets_from_gamma(limit=100, offset=0):
     """
@@ -57,9 +78,9 @@ def parse_token_ids(market):
     
     try:
         # Parse the stringified JSON array
-        token_ids = json.loads(clob_token_ids_str)
+        token_ids = orjson.loads(clob_token_ids_str)
         return token_ids
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         print(f"  Failed to parse clobTokenIds: {clob_token_ids_str}")
         return None
 
@@ -78,7 +99,7 @@ def check_order_book_exists(token_id):
     params = {"token_id": token_id}
     
     try:
-        response = requests.get(book_url, params=params)
+        response = _SESSION.get(book_url, params=params)
         return response.status_code == 200
     except Exception as e:
         print(f"  Error checking order book: {e}")
@@ -98,6 +119,7 @@ def find_market_with_order_book(gamma_markets):
     print(f"Searching through {len(gamma_markets)} markets for ones with active order books...")
     
     markets_checked = 0
+    candidates = []
     
     for m in gamma_markets:
         # Skip if m is not a dict
@@ -117,11 +139,19 @@ def find_market_with_order_book(gamma_markets):
         if not token_ids:
             continue
         
-        # Try to find a token with an active order book
-        for token_id in token_ids:
-            if token_id and check_order_book_exists(token_id):
-                print(f"Found working token ID: {token_id}")
-                return (m, token_id)
+        candidates.extend((m, token_id) for token_id in token_ids if token_id)
+    
+    # Probe the candidates in batches of PROBE_WORKERS, each batch
+    # concurrently, and return the earliest candidate (in Gamma order) with an
+    # active order book; later batches are never probed once one is found
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as executor:
+        for start in range(0, len(candidates), PROBE_WORKERS):
+            batch = candidates[start:start + PROBE_WORKERS]
+            results = executor.map(check_order_book_exists, [token_id for _, token_id in batch])
+            for (m, token_id), has_book in zip(batch, results):
+                if has_book:
+                    print(f"Found working token ID: {token_id}")
+                    return (m, token_id)
     
     print(f"Checked {markets_checked} markets")
     return (None, None)
@@ -142,9 +172,9 @@ def get_order_book(token_id, depth=50):
     params = {"token_id": token_id, "depth": depth}
     
     try:
-        response = requests.get(book_url, params=params)
+        response = _SESSION.get(book_url, params=params)
         if response.status_code == 200:
-            return response.json()
+            return orjson.loads(response.content)
         else:
             print(f"Error fetching order book: {response.status_code}")
             print(response.text)
@@ -154,6 +184,42 @@ def get_order_book(token_id, depth=50):
         return None
 
 
+def get_order_books(token_ids):
+    """
+    Fetch several order books with one POST /books request.
+    
+    One round trip over a single connection replaces a request (and possibly
+    a connection) per token.
+    
+    Args:
+        token_ids (list): Token IDs to fetch
+    
+    Returns:
+        dict: token_id -> order book data for every book returned (empty if
+              the request failed; callers can fall back to get_order_book)
+    """
+    if not token_ids:
+        return {}
+    
+    try:
+        response = _SESSION.post(
+            f"{CLOB_URL}/books",
+            data=orjson.dumps([{"token_id": token_id} for token_id in token_ids]),
+            headers={"Content-Type": "application/json"},
+            timeout=10,
+        )
+        if response.status_code != 200:
+            print(f"Error fetching order books: {response.status_code}")
+            return {}
+        books = orjson.loads(response.content)
+    except Exception as e:
+        print(f"Error fetching order books: {e}")
+        return {}
+    
+    # Books carry their token as asset_id; match on it rather than on position
+    return {book.get('asset_id'): book for book in books if isinstance(book, dict)}
+
+
 def save_order_book_to_file(market, token_id, book_data):
     """
     Save order book data to a JSON file in the data directory and to database.
@@ -182,8 +248,8 @@ def save_order_book_to_file(market, token_id, book_data):
         }
         
         # Save to JSON file
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         
         # Save to database
         if save_orderbook_to_db(market.get('id'), token_id, book_data):
@@ -284,9 +350,13 @@ def main():
                 print(f"  Successfully fetched order book!")
                 print(f"  Bids: {num_bids}, Asks: {num_asks}, Total: {num_bids + num_asks}")
                 
-                # Save to file
-                filename = save_order_book_to_file(market, token_id, book_data)
-                if filename:
+                # Save to the database (and a JSON file when debugging)
+                if WRITE_SNAPSHOT_FILES:
+                    saved = save_order_book_to_file(market, token_id, book_data) is not None
+                else:
+                    saved = save_orderbook_to_db(market.get('id'), token_id, book_data)
+                    print("  Order book saved to database" if saved else "  Database save failed")
+                if saved:
                     successful_fetches += 1
                     found_order_book = True
                     break
@@ -2,7 +2,8 @@
 # /// script
 # requires-python = ">=3.12"
 # dependencies = [
-#     "tabulate"
+#     "numpy",
+#     "orjson"
 # ]
 # ///
 """
@@ -15,10 +16,13 @@ in an easy to scan tabular format.
 
 import argparse
 import sqlite3
+import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Sequence, Tuple
+from typing import List, Tuple
 
-from tabulate import tabulate
+import numpy as np
+import orjson
 
 DB_PATH = Path("data/markets.db")
 
@@ -71,130 +75,151 @@ def ensure_database(db_path: Path) -> None:
         raise FileNotFoundError(f"Path is not a file: {db_path}")
 
 
+@lru_cache(maxsize=1)
 def open_connection(db_path: Path) -> sqlite3.Connection:
     """
-    Open a sqlite3 connection using Row factory for convenient column access.
+    Return the long-lived connection for ``db_path``, opening it on first use.
+
+    Reusing one connection keeps sqlite's page cache and prepared-statement
+    cache warm across calls (the SQL below lives in module-level constants so
+    the statement cache hits). Rows come back as plain tuples, which are
+    cheaper than sqlite3.Row and are unpacked positionally.
+
+    Journal and sync settings are left to the datastore that owns the file;
+    this only sizes the page cache and keeps sort/index temp data in memory.
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")  # 64 MB page cache
     return conn
 
 
-def fetch_market(conn: sqlite3.Connection, market_id: str) -> sqlite3.Row | None:
+MARKET_SQL = "SELECT id, question FROM markets WHERE id = ?;"
+
+
+def fetch_market(conn: sqlite3.Connection, market_id: str) -> Tuple[str, str] | None:
     """
-    Retrieve the market metadata to display context up front.
+    Retrieve the market (id, question) to display context up front.
     """
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, question FROM markets WHERE id = ?", (market_id,))
-    return cursor.fetchone()
+    return conn.execute(MARKET_SQL, (market_id,)).fetchone()
+
+
+# Newest row per token for one market, in a single statement. "Newest" is the
+# most recently saved row (the highest id; AUTOINCREMENT ids only grow). The
+# API timestamp cannot order rows: it is epoch-milliseconds text, does not
+# compare with created_at, and legacy rows have none. The inner query only
+# reads ids, so the bids/asks of older snapshots are never touched; the
+# payload columns are fetched by primary key for the winners only.
+_LATEST_ORDERBOOKS_TEMPLATE = """
+    SELECT id, token_id, timestamp, created_at, bids, asks, {blob_columns}
+    FROM orderbooks
+    WHERE id IN (
+        SELECT MAX(id) FROM orderbooks
+        WHERE market_id = ?{token_filter}
+        GROUP BY token_id
+    )
+    ORDER BY token_id;
+"""
 
+# The template rendered once per (has blob columns, filtered by token) variant
+LATEST_ORDERBOOKS_SQL = {
+    (blobs, by_token): _LATEST_ORDERBOOKS_TEMPLATE.format(
+        blob_columns="bids_blob, asks_blob" if blobs else "NULL, NULL",
+        token_filter=" AND token_id = ?" if by_token else "",
+    )
+    for blobs in (True, False)
+    for by_token in (True, False)
+}
 
-def fetch_tokens(
+
+def fetch_latest_orderbooks(
     conn: sqlite3.Connection, market_id: str, token_id: str | None
-) -> List[Tuple[int, str, str | None, str | None]]:
+) -> List[tuple]:
     """
-    Return the most recent order book row id plus metadata for each token.
+    Return the most recent order book row for each token of a market (or only
+    for ``token_id`` when given), including its bids and asks, as
+    (id, token_id, timestamp, created_at, bids, asks, bids_blob, asks_blob).
 
-    We rely on created_at when timestamp is missing because some legacy writes
-    did not populate the timestamp field. The function always returns the newest
-    row per token to keep the output concise.
+    Rows written by the current datastore carry packed float64 (price, size)
+    pairs in bids_blob/asks_blob; databases created before those columns
+    existed only have the JSON text columns, so they are selected as NULL.
     """
-    cursor = conn.cursor()
+    by_token = bool(token_id)
+    params: Tuple[str, ...] = (market_id, token_id) if by_token else (market_id,)
 
-    if token_id:
-        candidate_tokens: Sequence[str] = [token_id]
-    else:
-        cursor.execute(
-            "SELECT DISTINCT token_id FROM orderbooks WHERE market_id = ?;",
-            (market_id,),
-        )
-        candidate_tokens = [row["token_id"] for row in cursor.fetchall()]
-
-    results: List[Tuple[int, str, str | None, str | None]] = []
-
-    for token in candidate_tokens:
-        cursor.execute(
-            "SELECT id, token_id, timestamp, created_at "
-            "FROM orderbooks "
-            "WHERE market_id = ? AND token_id = ? "
-            "ORDER BY COALESCE(timestamp, created_at) DESC, id DESC "
-            "LIMIT 1;",
-            (market_id, token),
-        )
-        row = cursor.fetchone()
-        if row:
-            results.append(
-                (
-                    row["id"],
-                    row["token_id"],
-                    row["timestamp"],
-                    row["created_at"],
-                )
-            )
+    try:
+        return conn.execute(LATEST_ORDERBOOKS_SQL[True, by_token], params).fetchall()
+    except sqlite3.OperationalError:
+        return conn.execute(LATEST_ORDERBOOKS_SQL[False, by_token], params).fetchall()
 
-    return results
+
+def _decode_side(
+    blob: bytes | None, text: str | None
+) -> List[List[float]] | np.ndarray:
+    """
+    Decode one book side, preferring the packed BLOB over the JSON text. BLOBs
+    are returned as an (N, 2) array view of the buffer, without a copy.
+    """
+    if blob is not None:
+        return np.frombuffer(blob, dtype=np.float64).reshape(-1, 2)
+    return orjson.loads(text) if text else []
 
 
-def fetch_orderbook_rows(
-    conn: sqlite3.Connection, row_id: int
-) -> Tuple[List[List[float]], List[List[float]]]:
+def _as_levels(side: List[List[float]] | np.ndarray) -> np.ndarray:
     """
-    Pull the bids and asks JSON from the orderbooks table and convert them into
-    simple lists for display.
+    Normalize one side of the book into an (N, 2) float64 array of
+    [price, size] rows. Entries may be [price, size] lists or the API's
+    {"price", "size"} dicts, with numbers or numeric strings; levels without
+    a usable price are dropped.
     """
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT bids, asks FROM orderbooks WHERE id = ?;",
-        (row_id,),
-    )
-    row = cursor.fetchone()
-    if not row:
-        return [], []
+    if isinstance(side, np.ndarray):
+        return side
 
-    import json
+    pairs = []
+    for entry in side:
+        if isinstance(entry, list) and len(entry) >= 2:
+            pairs.append((entry[0], entry[1]))
+        elif isinstance(entry, dict):
+            pairs.append((entry.get("price"), entry.get("size")))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.float64)
 
-    bids = json.loads(row["bids"]) if row["bids"] else []
-    asks = json.loads(row["asks"]) if row["asks"] else []
-    return bids, asks
+    try:
+        levels = np.asarray(pairs, dtype=np.float64)
+    except (TypeError, ValueError):
+        # Some value is not numeric; convert one by one (failures become NaN)
+        levels = np.array(
+            [(_as_float(price), _as_float(size)) for price, size in pairs],
+            dtype=np.float64,
+        )
+    return levels[~np.isnan(levels[:, 0])]
 
 
 def format_book_side(
-    side: List[List[float]],
+    side: List[List[float]] | np.ndarray,
     limit: int,
     descending: bool,
 ) -> List[List[float]]:
     """
     Trim and normalize one side of the order book for human-friendly printing.
-    """
-    formatted = []
-    for entry in side:
-        if isinstance(entry, list) and len(entry) >= 2:
-            price, size = entry[0], entry[1]
-        elif isinstance(entry, dict):
-            price = entry.get("price")
-            size = entry.get("size")
-        else:
-            continue
 
-        try:
-            price_value = float(price)
-        except (TypeError, ValueError):
-            price_value = price
+    Only the best ``limit`` levels are needed, so they are selected with
+    np.argpartition (linear time) and just those are sorted.
+    """
+    levels = _as_levels(side)
+    keys = -levels[:, 0] if descending else levels[:, 0]
 
-        try:
-            size_value = float(size)
-        except (TypeError, ValueError):
-            size_value = size
+    if len(levels) > limit:
+        best = np.argpartition(keys, limit)[:limit]
+        levels, keys = levels[best], keys[best]
 
-        formatted.append([price_value, size_value])
-    sorted_rows = sorted(formatted, key=lambda item: item[0], reverse=descending)
-    return sorted_rows[:limit]
+    return levels[np.argsort(keys, kind="stable")].tolist()
 
 
 def _as_float(value) -> float | None:
     """
-    Best-effort conversion helper so we can compute mid prices even when the
-    stored JSON uses strings. Returns None when conversion fails.
+    Best-effort conversion helper for stored JSON that uses strings. Returns
+    None when conversion fails.
     """
     try:
         return float(value)
@@ -202,72 +227,81 @@ def _as_float(value) -> float | None:
         return None
 
 
+def _format_book(rows: List[List[float]], headers: Tuple[str, str]) -> str:
+    """
+    Render [price, size] rows as a right-aligned two-column text table.
+
+    The layout is fixed (two float columns), so a couple of f-strings per row
+    replace a general table formatter.
+    """
+    if not rows:
+        return "(empty)"
+    w0 = max(len(headers[0]), 12)
+    w1 = max(len(headers[1]), 12)
+    out = [f"{headers[0]:>{w0}}  {headers[1]:>{w1}}", f"{'-' * w0}  {'-' * w1}"]
+    out.extend(f"{price:>{w0}.6f}  {size:>{w1}.6f}" for price, size in rows)
+    return "\n".join(out)
+
+
 def print_orderbook(
-    market: sqlite3.Row,
+    market: Tuple[str, str],
     token_id: str,
     timestamp: str | None,
     created_at: str | None,
-    bids: List[List[float]],
-    asks: List[List[float]],
+    bids: List[List[float]] | np.ndarray,
+    asks: List[List[float]] | np.ndarray,
     limit: int,
 ) -> None:
     """
-    Render the order book side by side using tabulate for nice text tables.
+    Render the asks and bids as simple text tables, followed by mid and spread.
+
+    The report is assembled in memory and written with a single call.
     """
-    print("\n" + "=" * 80)
-    print(f"Market: {market['question']} ({market['id']})")
-    print(f"Token:  {token_id}")
+    market_id, question = market
+    out = ["", "=" * 80, f"Market: {question} ({market_id})", f"Token:  {token_id}"]
     if timestamp:
-        print(f"Time:   {timestamp}")
+        out.append(f"Time:   {timestamp}")
     if created_at:
-        print(f"Saved:  {created_at}")
-    print("=" * 80)
+        out.append(f"Saved:  {created_at}")
+    out.append("=" * 80)
 
     bid_rows = format_book_side(bids, limit, descending=True)
     ask_rows = format_book_side(asks, limit, descending=False)
 
     if not bid_rows and not ask_rows:
-        print("No order book data stored for this token.")
-        return
-
-    bid_table = tabulate(bid_rows, headers=["Bid Price", "Bid Size"], tablefmt="simple")
-    ask_table = tabulate(ask_rows, headers=["Ask Price", "Ask Size"], tablefmt="simple")
-
-    best_bid = _as_float(bid_rows[0][0]) if bid_rows else None
-    best_ask = _as_float(ask_rows[0][0]) if ask_rows else None
-
-    if best_bid is not None and best_ask is not None:
-        mid_price = (best_bid + best_ask) / 2
-        mid_message = (
-            f"Mid price: {mid_price:.6f} "
-            f"(best bid {best_bid:.6f}, best ask {best_ask:.6f})"
-        )
-    elif best_bid is None and best_ask is None:
-        mid_message = "Mid price: unavailable (missing both bid and ask data)."
-    elif best_bid is None:
-        mid_message = "Mid price: unavailable (missing bids)."
+        out.append("No order book data stored for this token.")
     else:
-        mid_message = "Mid price: unavailable (missing asks)."
-
-    print("\nAsks:")
-    print(ask_table if ask_rows else "(empty)")
-
-    print("\nBids:")
-    print(bid_table if bid_rows else "(empty)")
-
-    print(f"\n{mid_message}")
-
-    if best_bid is not None and best_ask is not None:
-        spread = best_ask - best_bid
-        spread_pct = (spread / best_bid * 100) if best_bid else None
-        if spread_pct is not None:
-            spread_message = f"Spread: {spread:.6f} ({spread_pct:.2f}%)"
+        best_bid = bid_rows[0][0] if bid_rows else None
+        best_ask = ask_rows[0][0] if ask_rows else None
+
+        out += [
+            "",
+            "Asks:",
+            _format_book(ask_rows, ("Ask Price", "Ask Size")),
+            "",
+            "Bids:",
+            _format_book(bid_rows, ("Bid Price", "Bid Size")),
+            "",
+        ]
+
+        if best_bid is not None and best_ask is not None:
+            spread = best_ask - best_bid
+            out.append(
+                f"Mid price: {(best_bid + best_ask) / 2:.6f} "
+                f"(best bid {best_bid:.6f}, best ask {best_ask:.6f})"
+            )
+            if best_bid:
+                out.append(f"Spread: {spread:.6f} ({spread / best_bid * 100:.2f}%)")
+            else:
+                out.append(f"Spread: {spread:.6f} (percentage unavailable)")
         else:
-            spread_message = f"Spread: {spread:.6f} (percentage unavailable)"
-    else:
-        spread_message = "Spread: unavailable"
+            missing = "bids" if best_bid is None else "asks"
+            out.append(f"Mid price: unavailable (missing {missing}).")
+            out.append("Spread: unavailable")
 
-    print(spread_message)
+    # One write for the whole report instead of a print per line
+    out.append("")
+    sys.stdout.write("\n".join(out))
 
 
 def main() -> int:
@@ -285,30 +319,26 @@ def main() -> int:
 
     conn = open_connection(db_path)
 
-    try:
-        market = fetch_market(conn, args.market_id)
-        if not market:
-            print(f"Error: market {args.market_id} not found in database.")
-            return 1
-
-        tokens = fetch_tokens(conn, args.market_id, args.token_id)
-        if not tokens:
-            print("No stored order book rows for the requested parameters.")
-            return 0
-
-        for row_id, token_id, timestamp, created_at in tokens:
-            bids, asks = fetch_orderbook_rows(conn, row_id)
-            print_orderbook(
-                market=market,
-                token_id=token_id,
-                timestamp=timestamp,
-                created_at=created_at,
-                bids=bids,
-                asks=asks,
-                limit=args.limit,
-            )
-    finally:
-        conn.close()
+    market = fetch_market(conn, args.market_id)
+    if not market:
+        print(f"Error: market {args.market_id} not found in database.")
+        return 1
+
+    rows = fetch_latest_orderbooks(conn, args.market_id, args.token_id)
+    if not rows:
+        print("No stored order book rows for the requested parameters.")
+        return 0
+
+    for _, token_id, timestamp, created_at, bids, asks, bids_blob, asks_blob in rows:
+        print_orderbook(
+            market=market,
+            token_id=token_id,
+            timestamp=timestamp,
+            created_at=created_at,
+            bids=_decode_side(bids_blob, bids),
+            asks=_decode_side(asks_blob, asks),
+            limit=args.limit,
+        )
 
     return 0
 
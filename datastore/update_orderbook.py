@@ -2,6 +2,7 @@
 # /// script
 # requires-python = ">=3.12"
 # dependencies = [
+#     "orjson",
 #     "requests"
 # ]
 # ///
@@ -15,16 +16,39 @@ order book ingestion flow while keeping the code easy to understand.
 """
 
 import argparse
-import json
+import atexit
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, List, Tuple
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from datastore import get_market, save_orderbook_to_db
+from datastore import (
+    build_orderbook_row,
+    get_market,
+    get_market_token_ids,
+    save_orderbooks_to_db,
+)
 
 CLOB_URL = "https://clob.polymarket.com"
 
+# Concurrent /book requests when refreshing a market's tokens
+FETCH_WORKERS = 8
+
+# Shared HTTP session so the concurrent /book calls reuse pooled keep-alive
+# connections instead of paying a TCP+TLS handshake per token
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+)
+_SESSION.mount("https://", _adapter)
+atexit.register(_SESSION.close)
+
 
 def parse_args() -> argparse.Namespace:
     """
@@ -71,18 +95,24 @@ def parse_args() -> argparse.Namespace:
 
 def extract_token_ids(market_row: dict) -> List[str]:
     """
-    Decode the stored clobTokenIds column and return a clean list of token ids.
+    Return the market's token ids as a clean list.
 
-    The column stores JSON text, so we handle empty strings gracefully and give
-    the caller a descriptive error if parsing fails.
+    Markets saved by the current datastore have their tokens in the
+    market_tokens table, which needs no JSON parsing. Older rows fall back to
+    decoding the stored clobTokenIds JSON text, handling empty strings
+    gracefully and giving the caller a descriptive error if parsing fails.
     """
+    stored = get_market_token_ids(market_row.get("id"))
+    if stored:
+        return stored
+
     raw_value = market_row.get("clobTokenIds")
     if not raw_value:
         raise ValueError("Market does not expose any clobTokenIds.")
 
     try:
-        parsed = json.loads(raw_value)
-    except json.JSONDecodeError as error:
+        parsed = orjson.loads(raw_value)
+    except orjson.JSONDecodeError as error:
         raise ValueError("Could not parse clobTokenIds JSON.") from error
 
     if not isinstance(parsed, Iterable):
@@ -94,7 +124,9 @@ def extract_token_ids(market_row: dict) -> List[str]:
     return cleaned
 
 
-def fetch_orderbook(token_id: str, depth: int) -> dict:
+def fetch_orderbook(
+    token_id: str, depth: int, session: requests.Session = _SESSION
+) -> dict:
     """
     Request the order book from the CLOB API.
 
@@ -105,7 +137,7 @@ def fetch_orderbook(token_id: str, depth: int) -> dict:
     params = {"token_id": token_id, "depth": depth}
 
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = session.get(url, params=params, timeout=10)
     except requests.RequestException as error:
         raise RuntimeError(f"Network error while fetching {token_id}") from error
 
@@ -114,9 +146,12 @@ def fetch_orderbook(token_id: str, depth: int) -> dict:
             f"CLOB API returned {response.status_code} for token {token_id}"
         )
 
+    # The whole payload is kept (it is stored as orderbook_data), so decode it
+    # in one orjson call on the raw bytes; a streaming parser would only pay
+    # off if we needed bids/asks alone, and is slower at /book payload sizes
     try:
-        payload = response.json()
-    except ValueError as error:
+        payload = orjson.loads(response.content)
+    except orjson.JSONDecodeError as error:
         raise RuntimeError(f"Invalid JSON returned for token {token_id}") from error
 
     return payload
@@ -125,47 +160,74 @@ def fetch_orderbook(token_id: str, depth: int) -> dict:
 def write_snapshot(directory: Path, token_id: str, payload: dict) -> Path:
     """
     Persist the fetched order book into a JSON file for offline inspection.
+
+    orjson serializes the whole decoded payload into one buffer, which is
+    written with a single call.
     """
     directory.mkdir(parents=True, exist_ok=True)
     path = directory / f"{token_id}.json"
-    with path.open("w", encoding="utf-8") as handle:
-        json.dump(payload, handle, indent=2)
+    path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
     return path
 
 
+def _fetch_token(
+    token_id: str, depth: int, snapshot_dir: Path | None
+) -> Tuple[dict, Path | None]:
+    """
+    Fetch one token's order book and write its snapshot when requested. Runs on
+    the worker pool, so it must not touch the database.
+    """
+    book = fetch_orderbook(token_id, depth)
+    snapshot_path = None
+    if snapshot_dir is not None:
+        snapshot_path = write_snapshot(snapshot_dir, token_id, book)
+    return book, snapshot_path
+
+
 def update_market_orderbooks(
     market_id: str, tokens: Iterable[str], depth: int, snapshot_dir: Path | None
 ) -> None:
     """
-    Iterate through the provided tokens, refresh their order books, and persist
-    the data to the database (and snapshots when requested).
+    Refresh the order books of the provided tokens and persist the data to the
+    database (and snapshots when requested).
+
+    The HTTP requests run concurrently on a thread pool; the fetched books are
+    then written from this thread in a single transaction (one commit per
+    market instead of one per token).
     """
-    successes = 0
     failures = 0
-
-    for token_id in tokens:
-        print(f"\nFetching order book for token {token_id}...")
-        try:
-            book = fetch_orderbook(token_id, depth)
-        except RuntimeError as error:
-            print(f"Error: {error}")
-            failures += 1
-            continue
-
-        bids = len(book.get("bids", []))
-        asks = len(book.get("asks", []))
-        print(f"  Received {bids} bids and {asks} asks.")
-
-        if snapshot_dir is not None:
-            snapshot_path = write_snapshot(snapshot_dir, token_id, book)
-            print(f"  Snapshot written to {snapshot_path}")
-
-        if save_orderbook_to_db(market_id, token_id, book):
-            print("  Order book stored in database.")
-            successes += 1
-        else:
-            print("  Failed to write order book into the database.")
-            failures += 1
+    rows = []
+
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        futures = {
+            executor.submit(_fetch_token, token_id, depth, snapshot_dir): token_id
+            for token_id in tokens
+        }
+        for future in as_completed(futures):
+            token_id = futures[future]
+            print(f"\nOrder book for token {token_id}:")
+            try:
+                book, snapshot_path = future.result()
+            except RuntimeError as error:
+                print(f"Error: {error}")
+                failures += 1
+                continue
+
+            bids = len(book.get("bids", []))
+            asks = len(book.get("asks", []))
+            print(f"  Received {bids} bids and {asks} asks.")
+
+            if snapshot_path is not None:
+                print(f"  Snapshot written to {snapshot_path}")
+
+            rows.append(build_orderbook_row(market_id, token_id, book))
+
+    successes = save_orderbooks_to_db(rows) if rows else 0
+    if successes:
+        print(f"\nStored {successes} order books in database.")
+    elif rows:
+        print("\nFailed to write order books into the database.")
+        failures += len(rows)
 
     print("\nSummary:")
     print(f"  Successful updates: {successes}")
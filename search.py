@@ -1,26 +1,53 @@
+import atexit
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Iterable, List, Tuple
 
 import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
 
 
 GAMMA_SEARCH_URL = "https://gamma-api.polymarket.com/public-search"
 GAMMA_EVENT_URL = "https://gamma-api.polymarket.com/events"
 
-
-def _fetch_event_markets(event_id: str) -> List[Dict]:
+# On-disk cache for search and event lookups: repeat runs within
+# GAMMA_CACHE_TTL seconds are served locally (unless the API's Cache-Control
+# says otherwise) instead of paying a round trip per request
+GAMMA_CACHE_PATH = os.path.join("data", "gamma_cache")
+GAMMA_CACHE_TTL = 300
+
+# Concurrent event lookups when search hits are lightweight event stubs
+EVENT_FETCH_WORKERS = 8
+
+# Cache misses go over pooled keep-alive connections shared by the event
+# lookup threads instead of a fresh TCP+TLS handshake per request
+_SESSION = requests_cache.CachedSession(
+    GAMMA_CACHE_PATH,
+    backend="sqlite",
+    expire_after=GAMMA_CACHE_TTL,
+    allowable_methods=("GET",),
+    cache_control=True,
+)
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+atexit.register(_SESSION.close)
+
+
+def _fetch_event_markets(event_id: str) -> List[Dict] | None:
     """
     Fetch full event details when the search payload only returned a lightweight stub.
     The expanded event includes the nested markets list that exposes real market ids.
+    Returns None when the lookup fails (an event without markets gives []).
     """
     try:
-        response = requests.get(f"{GAMMA_EVENT_URL}/{event_id}", timeout=10)
+        response = _SESSION.get(f"{GAMMA_EVENT_URL}/{event_id}", timeout=10)
     except requests.RequestException as exc:
         print(f"Warning: could not fetch event {event_id}: {exc}")
-        return []
+        return None
 
     if response.status_code != 200:
         print(f"Warning: event lookup for {event_id} returned {response.status_code}")
-        return []
+        return None
 
     event_payload = response.json()
     markets = event_payload.get("markets") or []
@@ -29,12 +56,26 @@ def _fetch_event_markets(event_id: str) -> List[Dict]:
     return markets
 
 
-def _resolve_markets(item: Dict) -> Tuple[bool, Iterable[Dict]]:
+def _event_stub_id(item: Dict) -> str | None:
+    """
+    Return the event id to look up when the search item is a lightweight event
+    stub (no nested markets and no market identifiers), otherwise None.
+    """
+    if item.get("markets") or item.get("marketId") or item.get("conditionId"):
+        return None
+    event_id = item.get("id")
+    return str(event_id) if event_id else None
+
+
+def _resolve_markets(
+    item: Dict, prefetched: Dict[str, List[Dict]] | None = None
+) -> Tuple[bool, Iterable[Dict]]:
     """
     Decide whether the search item represents a full market or an event.
-    Return a tuple (is_event, markets_iterable).
+    Return a tuple (is_event, markets_iterable). Event stubs are looked up in
+    `prefetched` (event id -> markets) first and fetched otherwise.
     """
-    nested = item.get("markets") or []
+    nested = item.get("markets")
     if nested:
         return True, nested
 
@@ -44,22 +85,27 @@ def _resolve_markets(item: Dict) -> Tuple[bool, Iterable[Dict]]:
 
     event_id = item.get("id")
     if event_id:
-        return True, _fetch_event_markets(str(event_id))
+        event_id = str(event_id)
+        if prefetched and event_id in prefetched:
+            return True, prefetched[event_id]
+        return True, _fetch_event_markets(event_id) or []
 
     return False, []
 
 
+def _market_title(market: Dict) -> str:
+    """
+    Return the market's question, falling back to its title.
+    """
+    return market.get("question") or market.get("title") or "Untitled Market"
+
+
 def _print_market(market: Dict, prefix: str = "") -> None:
     """
     Print a single market line with its id and question/title.
     """
-    market_id = market.get("id") or market.get("marketId")
-    if not market_id:
-        print(f"{prefix}Market <unknown id> {market.get('question') or market.get('title') or 'Untitled Market'}")
-        return
-
-    market_title = market.get("question") or market.get("title") or "Untitled Market"
-    print(f"{prefix}Market {market_id} {market_title}")
+    market_id = market.get("id") or market.get("marketId") or "<unknown id>"
+    print(f"{prefix}Market {market_id} {_market_title(market)}")
 
 
 def get_markets_for_query(query: str) -> List[Dict]:
@@ -75,7 +121,7 @@ def get_markets_for_query(query: str) -> List[Dict]:
     }
 
     try:
-        response = requests.get(GAMMA_SEARCH_URL, params=params, timeout=10)
+        response = _SESSION.get(GAMMA_SEARCH_URL, params=params, timeout=10)
     except requests.RequestException as exc:
         print(f"Search failed: {exc}")
         return []
@@ -89,24 +135,26 @@ def get_markets_for_query(query: str) -> List[Dict]:
     if not items:
         return []
 
-    flattened: List[Dict] = []
-    for item in items:
-        is_event, resolved_markets = _resolve_markets(item)
-        if is_event:
-            resolved_list = list(resolved_markets)
-            if not resolved_list:
-                continue
-            flattened.extend(resolved_list)
-        else:
-            flattened.extend(resolved_markets)
-
+    # Event stubs need a lookup each; fetch the distinct ids concurrently up
+    # front. Only successful lookups are kept, so a stub whose lookup failed
+    # is fetched again by _resolve_markets rather than treated as empty
+    needed = {event_id for event_id in map(_event_stub_id, items) if event_id}
+    prefetched: Dict[str, List[Dict]] = {}
+    if len(needed) > 1:
+        with ThreadPoolExecutor(max_workers=min(EVENT_FETCH_WORKERS, len(needed))) as executor:
+            for event_id, markets in zip(needed, executor.map(_fetch_event_markets, needed)):
+                if markets is not None:
+                    prefetched[event_id] = markets
+
+    # Events contribute each of their markets; items that resolve to nothing
+    # (or markets without an id) are skipped
     collected: List[Dict] = []
-    for market in flattened:
-        market_id = market.get("id") or market.get("marketId")
-        if not market_id:
-            continue
-        title = market.get("question") or market.get("title") or "Untitled Market"
-        collected.append({"id": str(market_id), "question": title})
+    for item in items:
+        _, resolved_markets = _resolve_markets(item, prefetched)
+        for market in resolved_markets:
+            market_id = market.get("id") or market.get("marketId")
+            if market_id:
+                collected.append({"id": str(market_id), "question": _market_title(market)})
 
     return collected
 
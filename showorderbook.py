@@ -1,6 +1,9 @@
 # /// script
 # requires-python = ">=3.12"
 # dependencies = [
+#     "brotli",
+#     "numpy",
+#     "orjson",
 #     "requests"
 # ]
 # ///
@@ -11,35 +14,129 @@ Fetches market data from Polymarket Gamma API and orderbook data from CLOB API,
 then displays it in a readable format.
 """
 
+import os
 import sys
+import time
 import argparse
-import json
+import numpy as np
+import orjson
 import requests
-from datastore.orderbook import parse_token_ids, get_order_book
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datastore.orderbook import parse_token_ids, get_order_book, get_order_books
 
 GAMMA_MARKET_URL = "https://gamma-api.polymarket.com/markets"
 GAMMA_EVENT_URL = "https://gamma-api.polymarket.com/events"
 
+# Shared HTTP session so the events fallback reuses the connection opened for
+# the markets lookup instead of paying another TCP+TLS handshake. With brotli
+# installed, requests advertises "br" in Accept-Encoding alongside gzip
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+)
+_SESSION.mount("https://", _adapter)
 
-def fetch_market_from_api(market_id):
+# Gamma market lookups are cached on disk for MARKET_CACHE_TTL seconds, so
+# repeated runs against the same market skip the round trip (--no-cache
+# bypasses the cache)
+MARKET_CACHE_DIR = Path.home() / ".cache" / "polymarket_shared" / "markets"
+MARKET_CACHE_TTL = 60
+
+# Max concurrent /book requests for tokens the batch /books call missed
+FETCH_WORKERS = 16
+
+# --depth default. The batch /books request takes no depth parameter, so it is
+# only used when the depth was left at this value
+DEFAULT_DEPTH = 50
+
+# Fixed pieces of the order book report, built once
+DIVIDER = "=" * 80
+LEVEL_HEADER = f"{'Price':<20} {'Size':<20} {'Value':<20}\n" + "-" * 60
+SPREAD_TEMPLATE = "\n".join([
+    "\n" + DIVIDER,
+    "Spread Analysis:",
+    "  Best Bid (Highest): %.6f",
+    "  Best Ask (Lowest): %.6f",
+    "  Spread: %.6f (%.2f%% of mid price)",
+    "  Mid Price: %.6f",
+])
+
+
+def _market_cache_path(market_id):
+    """Cache file for a market, or None for ids that are not safe file names"""
+    market_id = str(market_id)
+    return MARKET_CACHE_DIR / f"{market_id}.json" if market_id.isalnum() else None
+
+
+def _load_cached_market(market_id):
+    """
+    Return the cached market if it was stored less than MARKET_CACHE_TTL
+    seconds ago, otherwise None.
+    """
+    path = _market_cache_path(market_id)
+    if path is None:
+        return None
+    try:
+        if path.stat().st_mtime < time.time() - MARKET_CACHE_TTL:
+            return None
+        return orjson.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def _store_cached_market(market_id, market):
+    """Write the market to the cache (atomically, so readers never see a partial file)"""
+    path = _market_cache_path(market_id)
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(orjson.dumps(market))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def fetch_market_from_api(market_id, use_cache=True):
     """
     Fetch market data from Polymarket Gamma API by market ID.
     
     Args:
         market_id (str): Market ID to fetch
+        use_cache (bool): Serve and store the result through the on-disk
+                          market cache
     
     Returns:
         dict: Market object from API, or None if not found
     """
+    if use_cache:
+        market = _load_cached_market(market_id)
+        if market is not None:
+            return market
+    
+    market = _fetch_market_uncached(market_id)
+    if use_cache and market is not None:
+        _store_cached_market(market_id, market)
+    return market
+
+
+def _fetch_market_uncached(market_id):
+    """Look the market up on the Gamma API (see fetch_market_from_api)"""
     try:
         # Try markets endpoint first
-        response = requests.get(
+        response = _SESSION.get(
             GAMMA_MARKET_URL,
             params={"ids": market_id},
             timeout=10
         )
         response.raise_for_status()
-        payload = response.json()
+        payload = orjson.loads(response.content)
         
         # Handle list response
         if isinstance(payload, list):
@@ -52,9 +149,9 @@ def fetch_market_from_api(market_id):
         
         # If not found in markets endpoint, try events endpoint
         # (sometimes the ID refers to an event)
-        event_response = requests.get(f"{GAMMA_EVENT_URL}/{market_id}", timeout=10)
+        event_response = _SESSION.get(f"{GAMMA_EVENT_URL}/{market_id}", timeout=10)
         if event_response.status_code == 200:
-            event_data = event_response.json()
+            event_data = orjson.loads(event_response.content)
             markets = event_data.get("markets") or []
             if markets:
                 # If the ID was an event, return the first market
@@ -95,6 +192,74 @@ def get_token_ids_from_market(market):
     return parse_token_ids(market)
 
 
+def _to_array(levels):
+    """
+    Normalize order book levels into an (N, 2) float64 array of [price, size].
+    
+    A book side is homogeneous, so the level shape is checked once on the
+    first level and the matching loop runs without a per-level type check.
+    
+    Args:
+        levels (list): Levels as [price, size] lists or {'price', 'size'} dicts
+    
+    Returns:
+        np.ndarray: One row per level, in the input order
+    """
+    if levels and isinstance(levels[0], dict):
+        rows = [[float(x.get('price', 0)), float(x.get('size', 0))] for x in levels]
+    else:
+        rows = [[float(x[0]), float(x[1])] for x in levels]
+    return np.array(rows, dtype=np.float64).reshape(-1, 2)
+
+
+def _top_levels(levels, limit=20, descending=False):
+    """
+    Select the best `limit` levels by price, sorted best first.
+    
+    Only the shown levels need ordering, so they are picked with
+    np.argpartition (linear time) and just those are sorted; the rest of a
+    deep book is never sorted.
+    
+    Args:
+        levels (np.ndarray): (N, 2) array of [price, size]
+        limit (int): Number of levels to keep
+        descending (bool): True for bids (highest price first)
+    
+    Returns:
+        np.ndarray: Up to `limit` rows, best price first
+    """
+    keys = -levels[:, 0] if descending else levels[:, 0]
+    
+    if len(levels) > limit:
+        best = np.argpartition(keys, limit)[:limit]
+        levels, keys = levels[best], keys[best]
+    
+    return levels[np.argsort(keys, kind='stable')]
+
+
+def _level_rows(levels, limit=20):
+    """
+    Format the first `limit` sorted levels as report rows.
+    
+    Level values (price * size) and their total are computed as whole-array
+    operations rather than per row.
+    
+    Args:
+        levels (np.ndarray): Sorted (N, 2) array of [price, size]
+        limit (int): Number of levels to show
+    
+    Returns:
+        tuple: (list of row strings, total value of the shown levels)
+    """
+    top = levels[:limit]
+    values = top[:, 0] * top[:, 1]
+    rows = [
+        f"{price:<20.6f} {size:<20.6f} ${value:<19.2f}"
+        for (price, size), value in zip(top.tolist(), values.tolist())
+    ]
+    return rows, float(values.sum())
+
+
 def display_orderbook(token_id, book_data, token_index=None, total_tokens=None):
     """
     Display orderbook in a readable format.
@@ -109,115 +274,84 @@ def display_orderbook(token_id, book_data, token_index=None, total_tokens=None):
         print(f"  No orderbook data available")
         return
     
+    # The report is collected here and written in one call at the end
+    out = []
+    
     # Parse bids and asks
     bids = book_data.get('bids', [])
     asks = book_data.get('asks', [])
     
     # Header
-    print(f"\n{'='*80}")
+    out.append("\n" + DIVIDER)
     if token_index is not None and total_tokens is not None:
-        print(f"Token {token_index} of {total_tokens}")
-    print(f"Token ID: {token_id}")
-    print(f"{'='*80}")
+        out.append(f"Token {token_index} of {total_tokens}")
+    out.append(f"Token ID: {token_id}")
+    out.append(DIVIDER)
     
     # Display asks (selling side) - lowest price first
-    print(f"\nASKS (Selling - {len(asks)} levels):")
-    print(f"{'Price':<20} {'Size':<20} {'Value':<20}")
-    print("-" * 60)
-    
-    total_ask_value = 0
-    sorted_asks = sorted(asks, key=lambda x: float(x[0]) if isinstance(x, list) else float(x.get('price', 0)))
-    
-    for ask in sorted_asks[:20]:  # Show top 20
-        # Handle both array format [price, size] and dict format {'price': x, 'size': y}
-        if isinstance(ask, dict):
-            price = float(ask.get('price', 0))
-            size = float(ask.get('size', 0))
-        else:
-            price = float(ask[0])
-            size = float(ask[1])
-        value = price * size
-        total_ask_value += value
-        print(f"{price:<20.6f} {size:<20.6f} ${value:<19.2f}")
+    out.append(f"\nASKS (Selling - {len(asks)} levels):")
+    out.append(LEVEL_HEADER)
+    
+    ask_levels = _to_array(asks)
+    top_asks = _top_levels(ask_levels, 20, descending=False)
     
-    if len(sorted_asks) > 20:
-        print(f"... and {len(sorted_asks) - 20} more ask levels")
+    ask_rows, total_ask_value = _level_rows(top_asks)  # Show top 20
+    out.extend(ask_rows)
+    
+    if len(ask_levels) > 20:
+        out.append(f"... and {len(ask_levels) - 20} more ask levels")
     
     # Best ask (lowest ask price)
     best_ask = None
     best_ask_size = 0
-    if sorted_asks:
-        first_ask = sorted_asks[0]
-        if isinstance(first_ask, dict):
-            best_ask = float(first_ask.get('price', 0))
-            best_ask_size = float(first_ask.get('size', 0))
-        else:
-            best_ask = float(first_ask[0])
-            best_ask_size = float(first_ask[1])
-        print(f"\nBest Ask (Lowest): {best_ask:.6f} @ {best_ask_size:.6f}")
+    if len(top_asks):
+        best_ask, best_ask_size = top_asks[0].tolist()
+        out.append(f"\nBest Ask (Lowest): {best_ask:.6f} @ {best_ask_size:.6f}")
     
-    print(f"Total Ask Value (first 20): ${total_ask_value:.2f}")
+    out.append(f"Total Ask Value (first 20): ${total_ask_value:.2f}")
     
     # Display bids (buying side) - highest price first
-    print(f"\n{'='*80}")
-    print(f"BIDS (Buying - {len(bids)} levels):")
-    print(f"{'Price':<20} {'Size':<20} {'Value':<20}")
-    print("-" * 60)
-    
-    total_bid_value = 0
-    sorted_bids = sorted(bids, key=lambda x: float(x[0]) if isinstance(x, list) else float(x.get('price', 0)), reverse=True)
-    
-    for bid in sorted_bids[:20]:  # Show top 20
-        # Handle both array format [price, size] and dict format {'price': x, 'size': y}
-        if isinstance(bid, dict):
-            price = float(bid.get('price', 0))
-            size = float(bid.get('size', 0))
-        else:
-            price = float(bid[0])
-            size = float(bid[1])
-        value = price * size
-        total_bid_value += value
-        print(f"{price:<20.6f} {size:<20.6f} ${value:<19.2f}")
+    out.append("\n" + DIVIDER)
+    out.append(f"BIDS (Buying - {len(bids)} levels):")
+    out.append(LEVEL_HEADER)
     
-    if len(sorted_bids) > 20:
-        print(f"... and {len(sorted_bids) - 20} more bid levels")
+    bid_levels = _to_array(bids)
+    top_bids = _top_levels(bid_levels, 20, descending=True)
+    
+    bid_rows, total_bid_value = _level_rows(top_bids)  # Show top 20
+    out.extend(bid_rows)
+    
+    if len(bid_levels) > 20:
+        out.append(f"... and {len(bid_levels) - 20} more bid levels")
     
     # Best bid (highest bid price)
     best_bid = None
     best_bid_size = 0
-    if sorted_bids:
-        first_bid = sorted_bids[0]
-        if isinstance(first_bid, dict):
-            best_bid = float(first_bid.get('price', 0))
-            best_bid_size = float(first_bid.get('size', 0))
-        else:
-            best_bid = float(first_bid[0])
-            best_bid_size = float(first_bid[1])
-        print(f"\nBest Bid (Highest): {best_bid:.6f} @ {best_bid_size:.6f}")
+    if len(top_bids):
+        best_bid, best_bid_size = top_bids[0].tolist()
+        out.append(f"\nBest Bid (Highest): {best_bid:.6f} @ {best_bid_size:.6f}")
     
-    print(f"Total Bid Value (first 20): ${total_bid_value:.2f}")
+    out.append(f"Total Bid Value (first 20): ${total_bid_value:.2f}")
     
     # Spread calculation
     if best_bid is not None and best_ask is not None:
         spread = best_ask - best_bid
         mid_price = (best_bid + best_ask) / 2
         spread_pct = (spread / mid_price) * 100 if mid_price > 0 else 0
-        print(f"\n{'='*80}")
-        print(f"Spread Analysis:")
-        print(f"  Best Bid (Highest): {best_bid:.6f}")
-        print(f"  Best Ask (Lowest): {best_ask:.6f}")
-        print(f"  Spread: {spread:.6f} ({spread_pct:.2f}% of mid price)")
-        print(f"  Mid Price: {mid_price:.6f}")
+        out.append(SPREAD_TEMPLATE % (best_bid, best_ask, spread, spread_pct, mid_price))
     
     # Other metadata
-    print(f"\n{'='*80}")
+    out.append("\n" + DIVIDER)
     if 'timestamp' in book_data:
-        print(f"Timestamp: {book_data['timestamp']}")
+        out.append(f"Timestamp: {book_data['timestamp']}")
     if 'min_order_size' in book_data:
-        print(f"Min Order Size: {book_data['min_order_size']}")
+        out.append(f"Min Order Size: {book_data['min_order_size']}")
     if 'tick_size' in book_data:
-        print(f"Tick Size: {book_data['tick_size']}")
-    print(f"{'='*80}\n")
+        out.append(f"Tick Size: {book_data['tick_size']}")
+    out.append(DIVIDER + "\n")
+    
+    out.append("")
+    sys.stdout.write("\n".join(out))
 
 
 def main():
@@ -233,7 +367,14 @@ Examples:
     )
     parser.add_argument('market_id', nargs='?', help='Market ID to fetch orderbook for')
     parser.add_argument('--market-id', dest='market_id_arg', help='Market ID (alternative format)')
-    parser.add_argument('--depth', type=int, default=50, help='Number of price levels to fetch (default: 50)')
+    parser.add_argument(
+        '--depth', type=int, default=DEFAULT_DEPTH,
+        help=f'Number of price levels to fetch (default: {DEFAULT_DEPTH}). '
+             'The default fetches all tokens in one batch request; any other '
+             'value is sent with a separate request per token'
+    )
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Always fetch market metadata from the API (skip the {MARKET_CACHE_TTL}s disk cache)')
     
     args = parser.parse_args()
     
@@ -247,7 +388,7 @@ Examples:
     
     # Get market info from Polymarket API
     print(f"Fetching market {market_id} from Polymarket API...")
-    market = fetch_market_from_api(market_id)
+    market = fetch_market_from_api(market_id, use_cache=not args.no_cache)
     
     if not market:
         print(f"\nError: Market {market_id} not found on Polymarket")
@@ -266,9 +407,22 @@ Examples:
     
     print(f"\nFound {len(token_ids)} token(s) for this market")
     
-    # Fetch and display orderbook for each token
+    # Fetch every token's orderbook in one batch request (it takes no depth,
+    # so only at the default depth); any token it did not return is fetched
+    # individually, concurrently
+    requested = [token_id for token_id in token_ids if token_id]
+    books_by_token = get_order_books(requested) if args.depth == DEFAULT_DEPTH else {}
+    missing = [token_id for token_id in requested if token_id not in books_by_token]
+    if missing:
+        depth = args.depth
+        with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(missing))) as executor:
+            books_by_token.update(zip(missing, executor.map(
+                lambda token_id: get_order_book(token_id, depth=depth), missing
+            )))
+    books = [books_by_token.get(token_id) for token_id in token_ids]
+    
     successful_fetches = 0
-    for i, token_id in enumerate(token_ids, 1):
+    for i, (token_id, book_data) in enumerate(zip(token_ids, books), 1):
         if not token_id:
             continue
         
@@ -276,8 +430,6 @@ Examples:
         print(f"Fetching orderbook for token {i}/{len(token_ids)}: {token_id[:40]}...")
         print(f"{'#'*80}")
         
-        book_data = get_order_book(token_id, depth=args.depth)
-        
         if book_data:
             display_orderbook(token_id, book_data, token_index=i, total_tokens=len(token_ids))
             successful_fetches += 1
@@ -1,9 +1,16 @@
 import argparse
 import logging
+from functools import lru_cache
 from typing import List, Dict, Any
 
+import numpy as np
+
 from trading import initialize_client, get_address_from_key, key, POLYMARKET_PROXY_ADDRESS
 
+# Deriving the address from the private key is an elliptic-curve
+# multiplication; do it once per process
+_eoa_address = lru_cache(maxsize=1)(get_address_from_key)
+
 
 logging.basicConfig(
     level=logging.INFO,
@@ -35,26 +42,43 @@ def _format_usd(usd: float) -> str:
         return "$0.00"
 
 
-def _calculate_usd_amount(order: Dict[str, Any]) -> float:
-    """Calculate USD amount for an order based on remaining size and price."""
+def _to_float(value: Any) -> float:
+    """Convert to float, NaN when the value is not numeric."""
     try:
-        original_size = float(order.get('original_size') or order.get('size') or 0)
-        filled = float(order.get('filled') or 0)
-        price = float(order.get('price') or 0)
-        
-        remaining_size = original_size - filled
-        usd_amount = remaining_size * price
-        return max(0.0, usd_amount)  # Ensure non-negative
+        return float(value)
     except (ValueError, TypeError):
-        return 0.0
+        return np.nan
+
+
+def _calculate_usd_amounts(orders: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Calculate the USD amount of every order (remaining size * price) in one
+    vectorized pass. Orders with a non-numeric field count as 0, and amounts
+    are never negative.
+    """
+    count = len(orders)
+    sizes = np.fromiter(
+        (_to_float(o.get('original_size') or o.get('size') or 0) for o in orders),
+        dtype=np.float64, count=count
+    )
+    filled = np.fromiter((_to_float(o.get('filled') or 0) for o in orders), dtype=np.float64, count=count)
+    prices = np.fromiter((_to_float(o.get('price') or 0) for o in orders), dtype=np.float64, count=count)
+    
+    # NaN from a bad field propagates through the arithmetic and becomes 0
+    return np.nan_to_num(np.maximum(0.0, (sizes - filled) * prices), nan=0.0)
 
 
 def filter_orders(orders: List[Dict[str, Any]], market_id: str = None, token_id: str = None) -> List[Dict[str, Any]]:
-    if market_id:
-        orders = [o for o in orders if str(o.get('market_id') or o.get('marketId') or '') == str(market_id)]
-    if token_id:
-        orders = [o for o in orders if str(o.get('token_id') or o.get('tokenId') or '') == str(token_id)]
-    return orders
+    if not market_id and not token_id:
+        return orders
+    # Both filters are applied in a single pass over the orders
+    mid = str(market_id) if market_id else None
+    tid = str(token_id) if token_id else None
+    return [
+        o for o in orders
+        if (mid is None or str(o.get('market_id') or o.get('marketId') or '') == mid)
+        and (tid is None or str(o.get('token_id') or o.get('tokenId') or '') == tid)
+    ]
 
 
 def main():
@@ -65,7 +89,7 @@ def main():
     args = parser.parse_args()
 
     # Decide signature type based on proxy configuration
-    eoa_address = get_address_from_key(key)
+    eoa_address = _eoa_address(key)
     if POLYMARKET_PROXY_ADDRESS and POLYMARKET_PROXY_ADDRESS != eoa_address:
         client = initialize_client(signature_type=2, funder=POLYMARKET_PROXY_ADDRESS)
         logger.info("Using proxy wallet (signature_type=2)")
@@ -88,16 +112,11 @@ def main():
         return
 
     # Calculate USD amounts for all orders (before limiting display)
-    total_usd = 0.0
-    for o in orders:
-        usd_amount = _calculate_usd_amount(o)
-        total_usd += usd_amount
+    usd_amounts = _calculate_usd_amounts(orders)
+    total_usd = float(usd_amounts.sum())
 
     # Prepare orders for display (with USD amounts)
-    orders_with_usd = []
-    for o in orders[: args.limit]:
-        usd_amount = _calculate_usd_amount(o)
-        orders_with_usd.append((o, usd_amount))
+    orders_with_usd = zip(orders[: args.limit], usd_amounts[: args.limit].tolist())
 
     # Header
     print(f"\n{'ID':<24} {'Side':<6} {'Price':<10} {'Size':<10} {'Filled':<10} {'USD':<12} {'Status':<10} {'TokenId':<38} {'Market'}")
@@ -10,13 +10,22 @@ and other metrics compared to querying balances directly.
 
 import argparse
 import sys
+import orjson
 import toml
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 
 from trading import get_address_from_key
 
+# Deriving the address from the private key is an elliptic-curve
+# multiplication; do it once per process
+_eoa_address = lru_cache(maxsize=1)(get_address_from_key)
+
 # Load configuration
 SETTINGS_FILE = Path("settings.toml")
 
@@ -37,6 +46,22 @@ proxy_address = config.get("account", {}).get("proxy_address", "")
 # Data API base URL
 DATA_API_URL = "https://data-api.polymarket.com"
 
+# Pagination limits enforced by the /positions endpoint
+MAX_PAGE_SIZE = 500
+MAX_OFFSET = 10000
+
+# Shared HTTP session: keep-alive connections are reused across requests, and
+# transient gateway errors are retried. The default Accept-Encoding includes
+# "br" when brotli is installed (see requirements.txt); position pages are
+# repetitive JSON and compress far better with it than with gzip
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+)
+_SESSION.mount("https://", _adapter)
+
 
 def get_user_address() -> str:
     """
@@ -49,7 +74,7 @@ def get_user_address() -> str:
         print("ERROR: private_key not found in settings.toml")
         sys.exit(1)
     
-    eoa_address = get_address_from_key(key)
+    eoa_address = _eoa_address(key)
     
     # Use proxy address if set and different from EOA, otherwise use EOA
     if proxy_address and proxy_address != eoa_address:
@@ -97,8 +122,8 @@ def fetch_positions(
         "sizeThreshold": size_threshold,
         "redeemable": redeemable,
         "mergeable": mergeable,
-        "limit": min(limit, 500),  # Enforce max limit
-        "offset": min(offset, 10000),  # Enforce max offset
+        "limit": min(limit, MAX_PAGE_SIZE),  # Enforce max limit
+        "offset": min(offset, MAX_OFFSET),  # Enforce max offset
         "sortBy": sort_by,
         "sortDirection": sort_direction
     }
@@ -116,12 +141,16 @@ def fetch_positions(
         params["title"] = title[:100]  # Enforce max length
     
     try:
-        response = requests.get(url, params=params, timeout=30)
+        response = _SESSION.get(url, params=params, timeout=30)
         response.raise_for_status()
         
-        positions = response.json()
+        positions = orjson.loads(response.content)
         return positions if isinstance(positions, list) else []
         
+    except orjson.JSONDecodeError as e:
+        print(f"ERROR: Invalid JSON in positions response: {e}")
+        return []
+        
     except requests.exceptions.RequestException as e:
         print(f"ERROR: Failed to fetch positions: {e}")
         if hasattr(e, 'response') and e.response is not None:
@@ -133,6 +162,54 @@ def fetch_positions(
         return []
 
 
+def iter_positions(
+    user: str,
+    limit: int = 100,
+    offset: int = 0,
+    page_size: int = MAX_PAGE_SIZE,
+    **filters: Any
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Fetch up to `limit` positions page by page, yielding each page.
+    
+    The request for the next page is already in flight while the caller
+    processes the current one, so network time overlaps with parsing and
+    display instead of adding up.
+    
+    Args:
+        user: User address (required)
+        limit: Maximum total number of positions to return
+        offset: Offset of the first position
+        page_size: Positions per request (at most 500)
+        **filters: Remaining fetch_positions arguments (market, sort_by, ...)
+    
+    Yields:
+        Lists of position dictionaries, in API order
+    """
+    page_size = min(page_size, MAX_PAGE_SIZE)
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        def request(page_offset: int, remaining: int):
+            size = min(page_size, remaining)
+            future = executor.submit(fetch_positions, user, limit=size, offset=page_offset, **filters)
+            return future, page_offset, size
+        
+        pending = request(offset, limit)
+        while pending:
+            future, page_offset, size = pending
+            page = future.result()
+            limit -= len(page)
+            next_offset = page_offset + len(page)
+            
+            # A short page means the API has nothing more to return
+            pending = None
+            if len(page) == size and limit > 0 and next_offset <= MAX_OFFSET:
+                pending = request(next_offset, limit)
+            
+            if page:
+                yield page
+
+
 def format_price(price: Any) -> str:
     """Format price value for display."""
     try:
@@ -169,70 +246,89 @@ def format_percent_pnl(percent: Any) -> str:
         return "N/A"
 
 
-def display_positions(positions: List[Dict[str, Any]], detailed: bool = False):
+def display_positions(positions: Iterable[Dict[str, Any]], detailed: bool = False):
     """
     Display positions in a formatted table.
     
+    positions can be a lazy iterable (e.g. the pages of iter_positions
+    flattened): the compact view formats its rows and accumulates the totals
+    as positions arrive, so that work overlaps with the download of the next
+    page. The detailed view numbers positions out of the total, so it
+    collects them first.
+    
     Args:
-        positions: List of position dictionaries
+        positions: Iterable of position dictionaries
         detailed: If True, show detailed information for each position
     """
-    if not positions:
+    if detailed:
+        positions = list(positions)
+        count = len(positions)
+    else:
+        rows = []
+        total_initial = total_current = total_pnl = 0.0
+        for pos in positions:
+            title = (pos.get('title') or 'N/A')[:38]
+            outcome = (pos.get('outcome') or 'N/A')[:18]
+            size = format_size(pos.get('size', 0))
+            avg_price = format_price(pos.get('avgPrice', 0))
+            cur_price = format_price(pos.get('curPrice', 0))
+            cash_pnl = format_pnl(pos.get('cashPnl', 0))
+            percent_pnl = format_percent_pnl(pos.get('percentPnl', 0))
+            
+            rows.append(f"{title:<40} {outcome:<20} {size:<12} {avg_price:<10} {cur_price:<10} {cash_pnl:<12} {percent_pnl:<10}")
+            
+            total_initial += float(pos.get('initialValue', 0))
+            total_current += float(pos.get('currentValue', 0))
+            total_pnl += float(pos.get('cashPnl', 0))
+        count = len(rows)
+    
+    if not count:
         print("\nNo positions found.")
         return
     
-    print(f"\nFound {len(positions)} position(s):")
+    print(f"\nFound {count} position(s):")
     print("=" * 120)
     
     if detailed:
-        # Detailed view - one position per section
+        # Detailed view - one position per section, collected and written in
+        # one call
+        out = []
         for idx, pos in enumerate(positions, 1):
-            print(f"\n[Position {idx}/{len(positions)}]")
-            print("-" * 120)
-            print(f"Title: {pos.get('title', 'N/A')}")
-            print(f"Slug: {pos.get('slug', 'N/A')}")
-            print(f"Outcome: {pos.get('outcome', 'N/A')}")
-            print(f"Condition ID: {pos.get('conditionId', 'N/A')}")
-            print(f"Asset: {pos.get('asset', 'N/A')}")
-            print(f"\nPosition Details:")
-            print(f"  Size: {format_size(pos.get('size', 0))} shares")
-            print(f"  Average Price: {format_price(pos.get('avgPrice', 0))}")
-            print(f"  Current Price: {format_price(pos.get('curPrice', 0))}")
-            print(f"\nValue:")
-            print(f"  Initial Value: {format_price(pos.get('initialValue', 0))}")
-            print(f"  Current Value: {format_price(pos.get('currentValue', 0))}")
-            print(f"\nP&L:")
-            print(f"  Cash P&L: {format_pnl(pos.get('cashPnl', 0))}")
-            print(f"  Percent P&L: {format_percent_pnl(pos.get('percentPnl', 0))}")
-            print(f"  Realized P&L: {format_pnl(pos.get('realizedPnl', 0))}")
-            print(f"  Percent Realized P&L: {format_percent_pnl(pos.get('percentRealizedPnl', 0))}")
-            print(f"  Total Bought: {format_price(pos.get('totalBought', 0))}")
-            print(f"\nOther:")
-            print(f"  Redeemable: {pos.get('redeemable', False)}")
-            print(f"  Mergeable: {pos.get('mergeable', False)}")
-            print(f"  Negative Risk: {pos.get('negativeRisk', False)}")
+            out.append(f"\n[Position {idx}/{len(positions)}]")
+            out.append("-" * 120)
+            out.append(f"Title: {pos.get('title', 'N/A')}")
+            out.append(f"Slug: {pos.get('slug', 'N/A')}")
+            out.append(f"Outcome: {pos.get('outcome', 'N/A')}")
+            out.append(f"Condition ID: {pos.get('conditionId', 'N/A')}")
+            out.append(f"Asset: {pos.get('asset', 'N/A')}")
+            out.append(f"\nPosition Details:")
+            out.append(f"  Size: {format_size(pos.get('size', 0))} shares")
+            out.append(f"  Average Price: {format_price(pos.get('avgPrice', 0))}")
+            out.append(f"  Current Price: {format_price(pos.get('curPrice', 0))}")
+            out.append(f"\nValue:")
+            out.append(f"  Initial Value: {format_price(pos.get('initialValue', 0))}")
+            out.append(f"  Current Value: {format_price(pos.get('currentValue', 0))}")
+            out.append(f"\nP&L:")
+            out.append(f"  Cash P&L: {format_pnl(pos.get('cashPnl', 0))}")
+            out.append(f"  Percent P&L: {format_percent_pnl(pos.get('percentPnl', 0))}")
+            out.append(f"  Realized P&L: {format_pnl(pos.get('realizedPnl', 0))}")
+            out.append(f"  Percent Realized P&L: {format_percent_pnl(pos.get('percentRealizedPnl', 0))}")
+            out.append(f"  Total Bought: {format_price(pos.get('totalBought', 0))}")
+            out.append(f"\nOther:")
+            out.append(f"  Redeemable: {pos.get('redeemable', False)}")
+            out.append(f"  Mergeable: {pos.get('mergeable', False)}")
+            out.append(f"  Negative Risk: {pos.get('negativeRisk', False)}")
             if pos.get('endDate'):
-                print(f"  End Date: {pos.get('endDate')}")
+                out.append(f"  End Date: {pos.get('endDate')}")
+        out.append("")
+        sys.stdout.write("\n".join(out))
     else:
         # Compact table view
         print(f"\n{'Title':<40} {'Outcome':<20} {'Size':<12} {'Avg $':<10} {'Cur $':<10} {'P&L $':<12} {'P&L %':<10}")
         print("-" * 120)
+        print("\n".join(rows))
         
-        for pos in positions:
-            title = (pos.get('title') or 'N/A')[:38]
-            outcome = (pos.get('outcome') or 'N/A')[:18]
-            size = format_size(pos.get('size', 0))
-            avg_price = format_price(pos.get('avgPrice', 0))
-            cur_price = format_price(pos.get('curPrice', 0))
-            cash_pnl = format_pnl(pos.get('cashPnl', 0))
-            percent_pnl = format_percent_pnl(pos.get('percentPnl', 0))
-            
-            print(f"{title:<40} {outcome:<20} {size:<12} {avg_price:<10} {cur_price:<10} {cash_pnl:<12} {percent_pnl:<10}")
-        
-        # Summary statistics
-        total_initial = sum(float(p.get('initialValue', 0)) for p in positions)
-        total_current = sum(float(p.get('currentValue', 0)) for p in positions)
-        total_pnl = sum(float(p.get('cashPnl', 0)) for p in positions)
+        # Summary statistics (totals were accumulated with the rows)
         total_pnl_percent = ((total_current - total_initial) / total_initial * 100) if total_initial > 0 else 0
         
         print("-" * 120)
@@ -302,7 +398,7 @@ Examples:
         '--limit',
         type=int,
         default=100,
-        help='Maximum number of positions to return (default: 100, max: 500)'
+        help='Maximum number of positions to return (default: 100; fetched in pages of up to 500)'
     )
     parser.add_argument(
         '--offset',
@@ -347,19 +443,24 @@ Examples:
     print(f"\nFetching positions for: {user_address}")
     print(f"Data API: {DATA_API_URL}")
     
-    # Fetch positions
-    positions = fetch_positions(
-        user=user_address,
-        market=args.market,
-        event_id=args.event_id,
-        size_threshold=args.size_threshold,
-        redeemable=args.redeemable,
-        mergeable=args.mergeable,
-        limit=args.limit,
-        offset=args.offset,
-        sort_by=args.sort_by,
-        sort_direction=args.sort_direction,
-        title=args.title
+    # Positions are displayed as the pages stream in (the next page downloads
+    # while the current one is formatted)
+    positions = (
+        position
+        for page in iter_positions(
+            user=user_address,
+            market=args.market,
+            event_id=args.event_id,
+            size_threshold=args.size_threshold,
+            redeemable=args.redeemable,
+            mergeable=args.mergeable,
+            limit=args.limit,
+            offset=args.offset,
+            sort_by=args.sort_by,
+            sort_direction=args.sort_direction,
+            title=args.title
+        )
+        for position in page
     )
     
     # Display positions